@@ -21,8 +21,11 @@ from iconservice import *
 #  Consts
 # ================================================
 TAG = 'ICONSwap'
-VERSION = '0.4.2'
+VERSION = '0.5.0'
 ZERO_SCORE_ADDRESS = Address.from_string('cx0000000000000000000000000000000000000000')
 SWAP_MAX_DECIMALS = 7
+MAX_BATCH_SWAPS = 50
+# Maximum amount of swaps filled by a single market order
+MAX_MARKET_ORDER_FILLS = 30
 ICX_TOKEN_DECIMALS = 18
 ICONBET_WAGES_ADDRESS = Address.from_string('cx75e584ffe40cf361b3daa00fa6593198d47505d5')
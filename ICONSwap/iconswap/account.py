@@ -21,7 +21,47 @@ from ..scorelib.utils import *
 from ..scorelib.linked_list import *
 
 
-class AccountPendingSwapDB(UIDLinkedListDB):
+class _AccountPendingSwapListDB(UIDLinkedListDB):
+    """ The pending swaps of an account are prepended when created, so they are
+        sorted by descending swap id. A removed swap remembers the swap following it,
+        so a page following a swap that has been filled or cancelled since resumes
+        from the swap that followed it, without reading the list from its head.
+    """
+    # Successor of a swap that was the tail of the list
+    _TAIL = -1
+
+    def __init__(self, name: str, db: IconScoreDatabase):
+        super().__init__(name, db)
+        self._successors = DictDB(f'{name}_SUCCESSORS', db, value_type=int)
+
+    def remove(self, uid: int) -> None:
+        self._successors[uid] = self._get_node(uid).get_next() or _AccountPendingSwapListDB._TAIL
+        super().remove(uid)
+
+    def _iterate_from(self, uid: int):
+        yield uid
+        yield from super().iterate_after(uid)
+
+    def iterate_after(self, uid: int):
+        if not uid or self._node(uid).exists():
+            return super().iterate_after(uid)
+
+        # Follow the successors of the removed swaps, up to the first one still pending
+        cur_uid = uid
+        for _ in range(MAX_ITERATION_LOOP):
+            cur_uid = self._successors[cur_uid]
+            if not cur_uid:
+                # Removed before its successor was remembered
+                break
+            if cur_uid == _AccountPendingSwapListDB._TAIL:
+                return iter(())
+            if self._node(cur_uid).exists():
+                return self._iterate_from(cur_uid)
+
+        raise LinkedNodeNotFound(self._name, uid)
+
+
+class AccountPendingSwapDB(_AccountPendingSwapListDB):
     _NAME = 'ACCOUNT_PENDING_SWAP_DB'
 
     def __init__(self, address: Address, db: IconScoreDatabase):
@@ -35,11 +75,11 @@ class AccountFilledSwapDB(UIDLinkedListDB):
 
     def __init__(self, address: Address, db: IconScoreDatabase):
         name = f'{str(address)}_{AccountFilledSwapDB._NAME}'
-        super().__init__(name, db)
+        super().__init__(name, db, indexed=True)
         self._name = name
 
 
-class AccountPairPendingSwapDB(UIDLinkedListDB):
+class AccountPairPendingSwapDB(_AccountPendingSwapListDB):
     _NAME = 'ACCOUNT_PAIR_PENDING_SWAP_DB'
 
     def __init__(self, address: Address, pair: tuple, db: IconScoreDatabase):
@@ -55,5 +95,24 @@ class AccountPairFilledSwapDB(UIDLinkedListDB):
     def __init__(self, address: Address, pair: tuple, db: IconScoreDatabase):
         pair_name = MarketPairsDB.get_pair_name(pair)
         name = f'{str(address)}_{pair_name}_{AccountPairFilledSwapDB._NAME}'
-        super().__init__(name, db)
+        super().__init__(name, db, indexed=True)
+        self._name = name
+
+
+class AccountTradeDB(UIDLinkedListDB):
+    _NAME = 'ACCOUNT_TRADE_DB'
+
+    def __init__(self, address: Address, db: IconScoreDatabase):
+        name = f'{str(address)}_{AccountTradeDB._NAME}'
+        super().__init__(name, db, indexed=True)
+        self._name = name
+
+
+class AccountPairTradeDB(UIDLinkedListDB):
+    _NAME = 'ACCOUNT_PAIR_TRADE_DB'
+
+    def __init__(self, address: Address, pair: tuple, db: IconScoreDatabase):
+        pair_name = MarketPairsDB.get_pair_name(pair)
+        name = f'{str(address)}_{pair_name}_{AccountPairTradeDB._NAME}'
+        super().__init__(name, db, indexed=True)
         self._name = name
@@ -17,39 +17,408 @@
 from iconservice import *
 from .swap import *
 from ..interfaces.irc2 import *
+from ..scorelib.id_factory import *
 from ..scorelib.linked_list import *
+from ..scorelib.packed import *
+from ..scorelib.skip_list import *
+from ..scorelib.price import *
 from ..scorelib.set import *
+from ..scorelib.consts import *
 
 
 class InvalidMarketPair(Exception):
     pass
 
 
-class _MarketSidePendingSwapDB(UIDLinkedListDB):
-    """ _MarketSidePendingSwapDB is a linked list of swaps
-        sorted by a given "compare" function
+class InvalidMarketOrderMode(Exception):
+    pass
+
+
+class MarketMigrationPending(Exception):
+    pass
+
+
+class MarketOrderMode:
+    # The unfilled remainder rests in the order book as a new swap
+    GOOD_TILL_CANCELLED = 0
+    # The unfilled remainder is refunded
+    IMMEDIATE_OR_CANCEL = 1
+    # The order is refunded unless it can be filled completely
+    FILL_OR_KILL = 2
+
+    @staticmethod
+    def check_valid(mode: int) -> None:
+        if mode not in (MarketOrderMode.GOOD_TILL_CANCELLED,
+                        MarketOrderMode.IMMEDIATE_OR_CANCEL,
+                        MarketOrderMode.FILL_OR_KILL):
+            raise InvalidMarketOrderMode(mode)
+
+
+class _MarketLegacySidePendingSwapDB(UIDLinkedListDB):
+    """ _MarketLegacySidePendingSwapDB is the linked list of swaps
+        used as a market side before v0.5.0.
+        It is only kept in order to migrate the old order books.
      """
     _NAME = '_MARKET_SIDE_PENDING_SWAP_DB'
 
     def __init__(self, var_key: str, db: IconScoreDatabase):
-        name = var_key + _MarketSidePendingSwapDB._NAME
+        name = var_key + _MarketLegacySidePendingSwapDB._NAME
         super().__init__(name, db)
+        self._name = var_key
+
+
+class _MarketLegacyState:
+    # The legacy linked list is the market side, while its swaps are copied to the price levels
+    COPYING = 1
+    # The price levels are the market side, the legacy linked list is being deleted
+    DELETING = 2
+
+
+class _MarketPriceLevelDB:
+    """ _MarketPriceLevelDB is a FIFO queue of the swaps of a market side
+        sharing the same price, along with the total amounts of these swaps
+     """
+    _NAME = '_MARKET_PRICE_LEVEL_DB'
+
+    def __init__(self, level_id: int, var_key: str, db: IconScoreDatabase):
+        name = f'{var_key}_{level_id}{_MarketPriceLevelDB._NAME}'
+        self._swaps = UIDLinkedListDB(name, db)
+        self._base_amount = VarDB(f'{name}_BASE_AMOUNT', db, value_type=int)
+        self._quote_amount = VarDB(f'{name}_QUOTE_AMOUNT', db, value_type=int)
         self._name = name
         self._db = db
 
-    def add(self, new_swap_id: int, compare) -> None:
-        """ Iterate through swap list and insert it according to the price """
-        # Find positionning in the list for the current item
-        for cur_swap_id in self:
-            if compare(new_swap_id, cur_swap_id):
-                self.prepend_before(new_swap_id, cur_swap_id)
-                break
+    def __len__(self) -> int:
+        return len(self._swaps)
+
+    def __iter__(self):
+        return iter(self._swaps)
+
+    def iterate_after(self, swap_id: int):
+        return self._swaps.iterate_after(swap_id)
+
+    def select(self, offset: int) -> list:
+        return self._swaps.select(offset)
+
+    def amounts(self) -> tuple:
+        """ Returns the total (base, quote) amounts of the swaps in the price level """
+        return (self._base_amount.get(), self._quote_amount.get())
+
+    def add(self, swap_id: int, base_amount: int, quote_amount: int) -> None:
+        self._swaps.append(swap_id)
+        self._base_amount.set(self._base_amount.get() + base_amount)
+        self._quote_amount.set(self._quote_amount.get() + quote_amount)
+
+    def remove(self, swap_id: int, base_amount: int, quote_amount: int) -> None:
+        self._swaps.remove(swap_id)
+        self.fill(base_amount, quote_amount)
+
+    def fill(self, base_amount: int, quote_amount: int) -> None:
+        self._base_amount.set(self._base_amount.get() - base_amount)
+        self._quote_amount.set(self._quote_amount.get() - quote_amount)
+
+    def delete(self) -> None:
+        self._swaps.delete()
+        self._base_amount.remove()
+        self._quote_amount.remove()
+
+
+class _MarketSidePendingSwapDB:
+    """ _MarketSidePendingSwapDB is a skip list of price levels sorted by a
+        given "compare" function on their price, expressed in quote per base.
+        Each price level is a FIFO queue of swaps, so the swaps are retrieved
+        by price first, then by creation order.
+     """
+    _NAME = '_MARKET_SIDE_PENDING_SWAP_DB'
+
+    def __init__(self, var_key: str, db: IconScoreDatabase):
+        name = var_key + _MarketSidePendingSwapDB._NAME
+        self._levels = UIDSkipListDB(f'{name}_LEVELS', db, str)
+        self._level_ids = DictDB(f'{name}_LEVEL_IDS', db, value_type=int)
+        self._swap_levels = DictDB(f'{name}_SWAP_LEVELS', db, value_type=int)
+        self._length = VarDB(f'{name}_LENGTH', db, value_type=int)
+        # The pre-v0.5.0 linked list remains the market side until it has been migrated
+        self._legacy = _MarketLegacySidePendingSwapDB(var_key, db)
+        self._legacy_state = VarDB(f'{name}_LEGACY_STATE', db, value_type=int)
+        self._legacy_cursor = VarDB(f'{name}_LEGACY_CURSOR', db, value_type=int)
+        self._name = name
+        self._db = db
+
+    @staticmethod
+    def key_price(key: str) -> Price:
+        """ Returns the price of a price key, expressed in quote per base """
+        return Price.from_key(key)
+
+    def _level(self, level_id: int) -> _MarketPriceLevelDB:
+        return _MarketPriceLevelDB(level_id, self._name, self._db)
+
+    def __len__(self) -> int:
+        if self.is_legacy():
+            return len(self._legacy)
+        return self._length.get()
+
+    def is_legacy(self) -> bool:
+        """ Returns whether the swaps are still read from the pre-v0.5.0 linked list """
+        return self._legacy_state.get() == _MarketLegacyState.COPYING
+
+    def start_legacy_migration(self) -> None:
+        if len(self._legacy) > 0:
+            self._legacy_state.set(_MarketLegacyState.COPYING)
+
+    def legacy_steps(self) -> int:
+        """ Returns the amount of legacy swaps remaining to be copied or deleted """
+        state = self._legacy_state.get()
+        if state == _MarketLegacyState.COPYING:
+            return 2 * len(self._legacy) - self._length.get()
+        if state == _MarketLegacyState.DELETING:
+            return len(self._legacy)
+        return 0
+
+    def migrate_legacy(self, limit: int) -> int:
+        """ Copy up to `limit` swaps of the pre-v0.5.0 linked list to the price levels,
+            then delete the linked list once all its swaps have been copied.
+            The linked list is read until then, so the market side order doesn't change.
+            Returns the amount of steps unused from `limit`
+        """
+        state = self._legacy_state.get()
+
+        if state == _MarketLegacyState.COPYING:
+            cursor = self._legacy_cursor.get()
+            for swap_id in self._legacy.iterate_after(cursor):
+                if limit == 0:
+                    break
+                self.add(Swap(swap_id, self._db))
+                cursor = swap_id
+                limit -= 1
+            self._legacy_cursor.set(cursor)
+
+            if self._length.get() < len(self._legacy):
+                return limit
+            state = _MarketLegacyState.DELETING
+            self._legacy_state.set(state)
+            self._legacy_cursor.remove()
+
+        if state == _MarketLegacyState.DELETING:
+            while limit > 0 and len(self._legacy) > 0:
+                self._legacy.remove_head()
+                limit -= 1
+
+            if len(self._legacy) > 0:
+                return limit
+            self._legacy.delete()
+            self._legacy_state.remove()
+
+        return limit
+
+    def __iter__(self):
+        for swap_id, key in self.items():
+            yield swap_id
+
+    def items(self):
+        """ Iterate through the (swap id, price key) of the market side """
+        for level_id, key in self._levels.items():
+            for swap_id in self._level(level_id):
+                yield (swap_id, key)
+
+    def items_after(self, key: str, swap_id: int):
+        """ Iterate through the (swap id, price key) following the position of a swap,
+            even if this swap or its whole price level have been removed since.
+            Swaps of a price level are queued in creation order, so by ascending swap id.
+        """
+        level_id = self._level_ids[key]
+        if level_id:
+            # Finish the price level of the given swap first
+            level = self._level(level_id)
+            if self._swap_levels[swap_id] == level_id:
+                following = level.iterate_after(swap_id)
+            else:
+                following = (cur_id for cur_id in level if cur_id > swap_id)
+            for cur_id in following:
+                yield (cur_id, key)
+
+        for level_id, cur_key in self._levels.items_after_key(key, self.compare):
+            for cur_id in self._level(level_id):
+                yield (cur_id, cur_key)
+
+    def sweep(self):
+        """ Iterate lazily through the (swap id, price key) of the market side.
+            The following swap is read before yielding the current one,
+            so the current swap may be removed from the market side meanwhile.
+        """
+        items = self.items()
+        item = next(items, None)
+
+        while item:
+            following = next(items, None)
+            yield item
+            item = following
+
+    def levels(self):
+        """ Iterate through the (price, base amount, quote amount) of each price level """
+        for level_id, key in self._levels.items():
+            base_amount, quote_amount = self._level(level_id).amounts()
+            yield (self.key_price(key), base_amount, quote_amount)
+
+    def can_fill(self, amount: int, limit_fn, max_swaps: int, swap_amount_fn) -> bool:
+        """ Returns whether up to `max_swaps` swaps priced before the limit can receive
+            `amount` of their taker token.
+            The totals of the price levels are used, unless a price level holds more swaps
+            than allowed: its swaps taker amounts are read with `swap_amount_fn` then.
+        """
+        swaps = 0
+
+        for level_id, key in self._levels.items():
+            if limit_fn(self.key_price(key)):
+                return False
+
+            level = self._level(level_id)
+            count = len(level)
+            if swaps + count <= max_swaps:
+                swaps += count
+                amount -= self.taker_amount(*level.amounts())
+                if amount <= 0:
+                    return True
+                continue
+
+            # Only some swaps of this price level can be filled
+            for swap_id in level:
+                if swaps == max_swaps:
+                    return False
+                swaps += 1
+                amount -= swap_amount_fn(swap_id)
+                if amount <= 0:
+                    return True
+
+            return False
+
+        return False
+
+    def depth(self, price: Price) -> tuple:
+        """ Returns the total (base, quote) amounts of the swaps at a given price """
+        level_id = self._level_ids[price.reduced().key()]
+        if not level_id:
+            return (0, 0)
+        return self._level(level_id).amounts()
+
+    def select(self, offset: int) -> list:
+        """ Returns a limited amount of swaps, skipping whole price levels until offset """
+        if self.is_legacy():
+            return self._legacy.select(offset)
+
+        result = []
+
+        for level_id in self._levels:
+            level = self._level(level_id)
+            count = len(level)
+            if offset >= count:
+                offset -= count
+                continue
+
+            for swap_id in level.select(offset):
+                result.append(swap_id)
+                # Do a maximum iteration count of MAX_ITERATION_LOOP
+                if len(result) == MAX_ITERATION_LOOP:
+                    return result
+            offset = 0
+
+        if offset > 0:
+            # Offset is bigger than the size of the market side
+            raise StopIteration(self._name)
+
+        return result
+
+    def select_after(self, cursor: str) -> tuple:
+        """ Returns a limited amount of swaps following a cursor (empty for the first swap),
+            along with the cursor of the next page (empty if it is the last page).
+            A cursor is the "price key:swap id" position of the last swap of a page,
+            so it stays valid when this swap is filled or cancelled.
+        """
+        if self.is_legacy():
+            swap_id = int(cursor.rsplit(':', 1)[1]) if cursor else 0
+            items = ((cur_id, None) for cur_id in self._legacy.iterate_after(swap_id))
+        elif cursor:
+            key, swap_id = cursor.rsplit(':', 1)
+            items = self.items_after(key, int(swap_id))
         else:
-            self.append(new_swap_id)
+            items = self.items()
+
+        result = []
+
+        # Do a maximum iteration count of MAX_ITERATION_LOOP
+        for swap_id, key in items:
+            result.append(swap_id)
+            if len(result) == MAX_ITERATION_LOOP:
+                key = key or self.swap_key(Swap(swap_id, self._db))
+                return (result, f'{key}:{swap_id}')
+
+        return (result, '')
+
+    def swap_key(self, swap: Swap) -> str:
+        """ Returns the price key of a swap of the market side """
+        maker, taker = swap.get_orders()
+        base_amount, quote_amount = self.base_quote_amounts(maker.amount(), taker.amount())
+        return Price(quote_amount, base_amount).reduced().key()
+
+    def add(self, swap: Swap, compare) -> None:
+        """ Append the swap to its price level, creating the price level in O(log n) if needed """
+        maker, taker = swap.get_orders()
+        base_amount, quote_amount = self.base_quote_amounts(maker.amount(), taker.amount())
+        key = Price(quote_amount, base_amount).reduced().key()
+
+        level_id = self._level_ids[key]
+        if not level_id:
+            level_id = IdFactory(self._name + '_LEVEL', self._db).get_uid()
+            self._levels.add(level_id, key, compare)
+            self._level_ids[key] = level_id
+
+        self._level(level_id).add(swap.id(), base_amount, quote_amount)
+        self._swap_levels[swap.id()] = level_id
+        self._length.set(self._length.get() + 1)
+
+    def remove(self, swap: Swap) -> None:
+        """ Remove the swap from its price level, and the price level if it is now empty """
+        maker, taker = swap.get_orders()
+        base_amount, quote_amount = self.base_quote_amounts(maker.amount(), taker.amount())
+        level_id = self._swap_levels[swap.id()]
+        level = self._level(level_id)
+
+        level.remove(swap.id(), base_amount, quote_amount)
+        del self._swap_levels[swap.id()]
+        self._length.set(self._length.get() - 1)
+
+        if len(level) == 0:
+            del self._level_ids[self._levels.node_key(level_id)]
+            self._levels.remove(level_id)
+            level.delete()
+
+    def best_key(self) -> str:
+        """ Returns the price key of the first price level, empty if there is none """
+        if self.is_legacy():
+            return self.swap_key(Swap(next(iter(self._legacy)), self._db))
+
+        level_id = self._levels.head_id()
+        return self._levels.node_key(level_id) if level_id else ''
+
+    def partial_fill(self, swap: Swap, maker_amount: int, taker_amount: int) -> None:
+        """ Update the price level amounts after a swap has been partially filled """
+        base_amount, quote_amount = self.base_quote_amounts(maker_amount, taker_amount)
+        self._level(self._swap_levels[swap.id()]).fill(base_amount, quote_amount)
+
+    def clear(self) -> None:
+        """ Remove all the swaps and price levels from the market side """
+        for level_id, key in self._levels.items():
+            level = self._level(level_id)
+            for swap_id in level:
+                del self._swap_levels[swap_id]
+            del self._level_ids[key]
+            level.delete()
+
+        self._levels.clear()
+        self._length.set(0)
 
 
 class _MarketBuyersPendingSwapDB(_MarketSidePendingSwapDB):
-    """ _MarketBuyersPendingSwapDB is a linked list of swaps
+    """ _MarketBuyersPendingSwapDB is the price levels
         of buyers in a given market sorted by a descending price
      """
     _NAME = '_BUYERS'
@@ -57,40 +426,51 @@ class _MarketBuyersPendingSwapDB(_MarketSidePendingSwapDB):
     def __init__(self, var_key: str, db: IconScoreDatabase):
         name = var_key + _MarketBuyersPendingSwapDB._NAME
         super().__init__(name, db)
-        self._name = name
-        self._db = db
 
-    def compare(self, new_swap_id: int, cur_swap_id: int) -> bool:
-        new_swap_price = Swap(new_swap_id, self._db).get_price()
-        cur_swap_price = Swap(cur_swap_id, self._db).get_price()
-        return new_swap_price > cur_swap_price
+    @staticmethod
+    def base_quote_amounts(maker_amount: int, taker_amount: int) -> tuple:
+        # Buyers provide the quote token
+        return (taker_amount, maker_amount)
 
-    def add(self, new_swap_id: int) -> None:
-        super().add(new_swap_id, self.compare)
+    @staticmethod
+    def taker_amount(base_amount: int, quote_amount: int) -> int:
+        return base_amount
+
+    def compare(self, new_key: str, cur_key: str) -> bool:
+        return self.key_price(new_key) > self.key_price(cur_key)
+
+    def add(self, swap: Swap) -> None:
+        super().add(swap, self.compare)
 
 
 class _MarketSellersPendingSwapDB(_MarketSidePendingSwapDB):
-    """ _MarketSellersPendingSwapDB is a linked list of swaps
-        of sellers in a given market sorted by a descending price
+    """ _MarketSellersPendingSwapDB is the price levels
+        of sellers in a given market sorted by an ascending price
      """
     _NAME = '_SELLERS'
 
     def __init__(self, var_key: str, db: IconScoreDatabase):
         name = var_key + _MarketSellersPendingSwapDB._NAME
         super().__init__(name, db)
-        self._name = name
 
-    def compare(self, new_swap_id: int, cur_swap_id: int) -> bool:
-        new_swap_price = Swap(new_swap_id, self._db).get_inverted_price()
-        cur_swap_price = Swap(cur_swap_id, self._db).get_inverted_price()
-        return new_swap_price < cur_swap_price
+    @staticmethod
+    def base_quote_amounts(maker_amount: int, taker_amount: int) -> tuple:
+        # Sellers provide the base token
+        return (maker_amount, taker_amount)
+
+    @staticmethod
+    def taker_amount(base_amount: int, quote_amount: int) -> int:
+        return quote_amount
+
+    def compare(self, new_key: str, cur_key: str) -> bool:
+        return self.key_price(new_key) < self.key_price(cur_key)
 
-    def add(self, new_swap_id: int) -> None:
-        super().add(new_swap_id, self.compare)
+    def add(self, swap: Swap) -> None:
+        super().add(swap, self.compare)
 
 
 class MarketPendingSwapDB:
-    """ MarketPendingSwapDB is two linked lists of swaps (buyers and sellers)
+    """ MarketPendingSwapDB is two order book sides of swaps (buyers and sellers)
         sorted by their price
      """
     _NAME = '_MARKET_PENDING_SWAP_DB'
@@ -99,35 +479,83 @@ class MarketPendingSwapDB:
         self._name = MarketPairsDB.get_pair_name(pair) + MarketPendingSwapDB._NAME
         self._buyers = _MarketBuyersPendingSwapDB(self._name, db)
         self._sellers = _MarketSellersPendingSwapDB(self._name, db)
+        self._summary = MarketSummaryDB(pair, db)
+        self._migrated = False
         self._pair = pair
         self._db = db
 
     def __len__(self) -> int:
         return len(self._buyers) + len(self._sellers)
 
+    def start_legacy_migration(self) -> None:
+        """ Keep reading the pre-v0.5.0 linked lists until they are migrated (see migrate_legacy_sides) """
+        for side in (self._buyers, self._sellers):
+            side.start_legacy_migration()
+            self.update_summary(side)
+
+    def legacy_steps(self) -> int:
+        return self._buyers.legacy_steps() + self._sellers.legacy_steps()
+
+    def migrate_legacy_sides(self, limit: int) -> int:
+        """ Move up to `limit` swaps of the pre-v0.5.0 linked lists to the price levels.
+            Returns the amount of steps remaining """
+        for side in (self._buyers, self._sellers):
+            was_legacy = side.is_legacy()
+            limit = side.migrate_legacy(limit)
+            if was_legacy and not side.is_legacy():
+                self.update_summary(side)
+
+        return self.legacy_steps()
+
+    def check_migrated(self) -> None:
+        """ Raise if the order book is still read from the pre-v0.5.0 linked lists,
+            as they cannot be written anymore """
+        if self._migrated:
+            return
+        if self._buyers.is_legacy() or self._sellers.is_legacy():
+            raise MarketMigrationPending(self._name)
+        self._migrated = True
+
+    @staticmethod
+    def key_price(key: str) -> Price:
+        """ Returns the price of an order book price key """
+        return _MarketSidePendingSwapDB.key_price(key)
+
     def buyers(self) -> _MarketBuyersPendingSwapDB:
         return self._buyers
 
     def sellers(self) -> _MarketSellersPendingSwapDB:
         return self._sellers
 
-    def add(self, new_swap_id: int) -> None:
-        swap = Swap(new_swap_id, self._db)
+    def _side(self, swap: Swap) -> _MarketSidePendingSwapDB:
         maker, taker = swap.get_orders()
         pair = (maker.contract(), taker.contract())
         if MarketPairsDB.is_buyer(pair, maker.contract()):
-            self._buyers.add(new_swap_id)
-        else:
-            self._sellers.add(new_swap_id)
+            return self._buyers
+        return self._sellers
 
-    def remove(self, swap_id: int) -> None:
-        swap = Swap(swap_id, self._db)
-        maker, taker = swap.get_orders()
-        pair = (maker.contract(), taker.contract())
-        if MarketPairsDB.is_buyer(pair, maker.contract()):
-            self._buyers.remove(swap_id)
+    def update_summary(self, side: _MarketSidePendingSwapDB) -> None:
+        """ Copy the swaps count and the best price of a side to the market summary """
+        if side is self._buyers:
+            self._summary.set_buyers(len(side), side.best_key())
         else:
-            self._sellers.remove(swap_id)
+            self._summary.set_sellers(len(side), side.best_key())
+
+    def add(self, swap: Swap) -> None:
+        self.check_migrated()
+        side = self._side(swap)
+        side.add(swap)
+        self.update_summary(side)
+
+    def remove(self, swap: Swap) -> None:
+        self.check_migrated()
+        side = self._side(swap)
+        side.remove(swap)
+        self.update_summary(side)
+
+    def partial_fill(self, swap: Swap, maker_amount: int, taker_amount: int) -> None:
+        self.check_migrated()
+        self._side(swap).partial_fill(swap, maker_amount, taker_amount)
 
 
 class MarketFilledSwapDB(UIDLinkedListDB):
@@ -135,8 +563,65 @@ class MarketFilledSwapDB(UIDLinkedListDB):
 
     def __init__(self, pair: tuple, db: IconScoreDatabase):
         name = MarketPairsDB.get_pair_name(pair) + '_' + MarketFilledSwapDB._NAME
-        super().__init__(name, db)
+        super().__init__(name, db, indexed=True)
+        self._name = name
+
+
+class MarketSummaryDB:
+    """ MarketSummaryDB is a single record of the figures of a market,
+        kept up to date when its order book changes and when its swaps are traded,
+        so they can be read at once.
+        Prices are price keys expressed in quote per base, empty if unknown.
+     """
+    _NAME = 'MARKET_SUMMARY_DB'
+
+    # Fields of the packed record, in storage order
+    _FIELDS = ('last_price', 'best_bid', 'best_ask', 'buyers_count', 'sellers_count',
+               'trade_count', 'base_volume', 'quote_volume')
+    _TYPES = (str, str, str, int, int, int, int, int)
+    _DEFAULTS = ('', '', '', 0, 0, 0, 0, 0)
+
+    def __init__(self, pair: tuple, db: IconScoreDatabase):
+        name = MarketPairsDB.get_pair_name(pair) + '_' + MarketSummaryDB._NAME
+        self._record = VarDB(f'{name}_RECORD', db, value_type=bytes)
+        self._pair = pair
         self._name = name
+        self._db = db
+
+    def get(self) -> dict:
+        record = self._record.get()
+        values = PackedRecord.unpack(record, MarketSummaryDB._TYPES) if record else MarketSummaryDB._DEFAULTS
+        return dict(zip(MarketSummaryDB._FIELDS, values))
+
+    def _set(self, summary: dict) -> None:
+        self._record.set(PackedRecord.pack([summary[field] for field in MarketSummaryDB._FIELDS], MarketSummaryDB._TYPES))
+
+    def _update(self, **fields) -> None:
+        summary = self.get()
+        summary.update(fields)
+        self._set(summary)
+
+    def set_buyers(self, count: int, best_bid: str) -> None:
+        self._update(buyers_count=count, best_bid=best_bid)
+
+    def set_sellers(self, count: int, best_ask: str) -> None:
+        self._update(sellers_count=count, best_ask=best_ask)
+
+    def set_last_trade(self, last_price: str, trade_count: int) -> None:
+        self._update(last_price=last_price, trade_count=trade_count)
+
+    def add_trade(self, maker_contract: Address, maker_amount: int, taker_amount: int) -> None:
+        if MarketPairsDB.is_buyer(self._pair, maker_contract):
+            base_amount, quote_amount = taker_amount, maker_amount
+        else:
+            base_amount, quote_amount = maker_amount, taker_amount
+
+        summary = self.get()
+        summary['last_price'] = Price(quote_amount, base_amount).reduced().key()
+        summary['trade_count'] += 1
+        summary['base_volume'] += base_amount
+        summary['quote_volume'] += quote_amount
+        self._set(summary)
 
 
 class MarketPairsDB(SetDB):
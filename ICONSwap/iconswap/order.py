@@ -17,6 +17,7 @@
 from iconservice import *
 from .consts import *
 from ..scorelib.id_factory import *
+from ..scorelib.packed import *
 from ..scorelib.utils import *
 
 EMPTY_ORDER_PROVIDER = Address.from_string("hx0000000000000000000000000000000000000000")
@@ -46,6 +47,10 @@ class InvalidOrderContract(Exception):
     pass
 
 
+class OrderNotFound(Exception):
+    pass
+
+
 class OrderFactory(IdFactory):
 
     _NAME = 'ORDER_FACTORY'
@@ -61,13 +66,22 @@ class OrderFactory(IdFactory):
                provider: Address = EMPTY_ORDER_PROVIDER) -> int:
 
         order_id = self.get_uid()
-        order = Order(order_id, self._db)
-        order._contract.set(contract)
-        order._amount.set(amount)
-        order._status.set(OrderStatus.EMPTY)
-        order._provider.set(provider)
+        self.init(order_id, contract, amount, provider)
         return order_id
 
+    def init(self, order_id: int,
+             contract: Address,
+             amount: int,
+             provider: Address = EMPTY_ORDER_PROVIDER) -> None:
+        """ Initialize an order whose id has been reserved with get_uids """
+        order = Order(order_id, self._db)
+        order._save({
+            'contract': contract,
+            'amount': amount,
+            'provider': provider,
+            'status': OrderStatus.EMPTY
+        })
+
 
 class OrderStatus:
     EMPTY = 0
@@ -80,80 +94,143 @@ class Order(object):
 
     _NAME = 'ORDER'
 
+    # Fields of the packed record, in storage order
+    _FIELDS = ('contract', 'amount', 'provider', 'status')
+    _TYPES = (Address, int, Address, int)
+
     # ================================================
     #  Initialization
     # ================================================
     def __init__(self, uid: int, db: IconScoreDatabase):
         self._name = Order._NAME
+        self._record = VarDB(f'{self._name}_RECORD_{uid}', db, value_type=bytes)
+        # Orders created before v0.5.0 use one VarDB per field until they get packed
         self._contract = VarDB(f'{self._name}_CONTRACT_{uid}', db, value_type=Address)
         self._amount = VarDB(f'{self._name}_AMOUNT_{uid}', db, value_type=int)
         self._provider = VarDB(f'{self._name}_PROVIDER_{uid}', db, value_type=Address)
         self._status = VarDB(f'{self._name}_STATUS_{uid}', db, value_type=int)
+        self._legacy = {
+            'contract': self._contract,
+            'amount': self._amount,
+            'provider': self._provider,
+            'status': self._status
+        }
+        # Fields are lazily loaded
+        self._fields = {}
+        self._packed = None
         self._uid = uid
         self._db = db
 
+    # ================================================
+    #  Storage
+    # ================================================
+    def _is_packed(self) -> bool:
+        if self._packed is None:
+            record = self._record.get()
+            self._packed = record is not None
+            if self._packed:
+                self._fields = dict(zip(Order._FIELDS, PackedRecord.unpack(record, Order._TYPES)))
+        return self._packed
+
+    def _get(self, field: str):
+        if field not in self._fields:
+            if self._is_packed():
+                return self._fields[field]
+            self._fields[field] = self._legacy[field].get()
+        return self._fields[field]
+
+    def _save(self, fields: dict) -> None:
+        self._fields = fields
+        self._packed = True
+        self._record.set(PackedRecord.pack([fields[field] for field in Order._FIELDS], Order._TYPES))
+
+    def _update(self, **fields) -> None:
+        if self._is_packed():
+            self._fields.update(fields)
+            self._save(self._fields)
+        else:
+            for field, value in fields.items():
+                self._legacy[field].set(value)
+                self._fields[field] = value
+
+    def exists(self) -> bool:
+        return self._get('contract') is not None
+
+    def is_packed(self) -> bool:
+        return self._is_packed()
+
+    def pack(self) -> None:
+        """ Convert a legacy order to a packed record """
+        if self._is_packed():
+            return
+        self._save({field: self._get(field) for field in Order._FIELDS})
+        for var in self._legacy.values():
+            var.remove()
+
     # ================================================
     #  Checks
     # ================================================
+    def check_exists(self) -> None:
+        # Order ids are generated sequentially, and deleted orders don't have a record anymore
+        if not OrderFactory(self._db).is_issued(self._uid) or not self.exists():
+            raise OrderNotFound(self._uid)
+
     def check_status(self, status: int) -> None:
-        if self._status.get() != status:
+        if self.status() != status:
             raise InvalidOrderStatus(
                 f'{self._name}_{self._uid}',
-                Utils.enum_names(OrderStatus)[self._status.get()],
+                Utils.enum_names(OrderStatus)[self.status()],
                 Utils.enum_names(OrderStatus)[status])
 
     def check_content(self, contract: Address, amount: int) -> None:
-        if ((self._contract.get() != contract) or (self._amount.get() < amount) or (amount <= 0)):
-            raise InvalidOrderContent(self._contract.get(), contract, self._amount.get(), amount)
+        if ((self.contract() != contract) or (self.amount() < amount) or (amount <= 0)):
+            raise InvalidOrderContent(self.contract(), contract, self.amount(), amount)
 
     def check_provider(self, provider: Address) -> None:
-        order_provider = self._provider.get()
+        order_provider = self.provider()
         if order_provider != EMPTY_ORDER_PROVIDER and order_provider != provider:
-            raise InvalidOrderProvider(self._provider.get())
+            raise InvalidOrderProvider(order_provider)
 
     # ================================================
     #  Public Methods
     # ================================================
     def set_status(self, status: int) -> None:
-        self._status.set(status)
+        self._update(status=status)
 
     def contract(self) -> Address:
-        return self._contract.get()
+        return self._get('contract')
 
     def provider(self) -> Address:
-        return self._provider.get()
+        return self._get('provider')
 
     def amount(self) -> int:
-        return self._amount.get()
+        return self._get('amount')
 
     def id(self) -> int:
         return self._uid
 
     def status(self) -> int:
-        return self._status.get()
+        return self._get('status')
 
     def fill(self, provider: Address) -> None:
-        self._provider.set(provider)
-        self._status.set(OrderStatus.FILLED)
+        self._update(provider=provider, status=OrderStatus.FILLED)
 
     def partial_fill(self, amount: int) -> None:
-        self._amount.set(self._amount.get() - amount)
+        self._update(amount=self.amount() - amount)
 
     def empty(self) -> None:
-        self._provider.set(EMPTY_ORDER_PROVIDER)
-        self._status.set(OrderStatus.EMPTY)
+        self._update(provider=EMPTY_ORDER_PROVIDER, status=OrderStatus.EMPTY)
 
     def serialize(self) -> dict:
         return {
             'id': self._uid,
-            'contract': str(self._contract.get()),
-            'amount': self._amount.get(),
-            'status': Utils.enum_names(OrderStatus)[self._status.get()],
-            'provider': str(self._provider.get())
+            'contract': str(self.contract()),
+            'amount': self.amount(),
+            'status': Utils.enum_names(OrderStatus)[self.status()],
+            'provider': str(self.provider())
         }
 
     def delete(self) -> None:
-        self._contract.remove()
-        self._amount.remove()
-        self._status.remove()
-        self._provider.remove()
+        self._record.remove()
+        for var in self._legacy.values():
+            var.remove()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 ICONation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from iconservice import *
+from ..checks import *
+
+
+class Settlement:
+    """ Settlement accumulates the funds owed to an address during an external call,
+        so they can be paid with a single transfer per token at the end of the call.
+    """
+
+    def __init__(self, address: Address):
+        self._address = address
+        # Contract => amount, in order of first appearance
+        self._amounts = {}
+
+    def address(self) -> Address:
+        return self._address
+
+    def add(self, contract: Address, amount: int) -> None:
+        self._amounts[contract] = self._amounts.get(contract, 0) + amount
+
+    def items(self):
+        """ Iterate through the (contract, amount) owed to the address """
+        return self._amounts.items()
+
+
+def settlement_scope(func):
+    """ Discard the settlement started by the method when it ends, even if it fails,
+        so the transfers of a following call are never accumulated in it """
+    if not isfunction(func):
+        raise NotAFunctionError
+
+    @wraps(func)
+    def __wrapper(self: object, *args, **kwargs):
+        previous = self._settlement
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self._settlement = previous
+
+    return __wrapper
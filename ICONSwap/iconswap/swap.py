@@ -18,6 +18,8 @@ from iconservice import *
 from .consts import *
 from .order import *
 from ..scorelib.id_factory import *
+from ..scorelib.packed import *
+from ..scorelib.price import *
 from ..scorelib.utils import *
 
 # ================================================
@@ -29,6 +31,10 @@ class InvalidSwapStatus(Exception):
     pass
 
 
+class SwapNotFound(Exception):
+    pass
+
+
 class SwapFactory(IdFactory):
 
     _NAME = 'SWAP_FACTORY'
@@ -46,11 +52,14 @@ class SwapFactory(IdFactory):
 
         swap_id = self.get_uid()
         swap = Swap(swap_id, self._db)
-        swap._maker_order_id.set(maker_order_id)
-        swap._taker_order_id.set(taker_order_id)
-        swap._timestamp_create.set(timestamp)
-        swap._timestamp_swap.set(0)
-        swap._status.set(SwapStatus.PENDING)
+        swap._save({
+            'maker_order_id': maker_order_id,
+            'taker_order_id': taker_order_id,
+            'status': SwapStatus.PENDING,
+            'timestamp_create': timestamp,
+            'timestamp_swap': 0,
+            'transaction': ''
+        })
 
         return swap_id
 
@@ -65,32 +74,105 @@ class Swap(object):
 
     _NAME = 'SWAP'
 
+    # Fields of the packed record, in storage order
+    _FIELDS = ('maker_order_id', 'taker_order_id', 'status', 'timestamp_create', 'timestamp_swap', 'transaction')
+    _TYPES = (int, int, int, int, int, str)
+
     # ================================================
     #  Initialization
     # ================================================
     def __init__(self, uid: int, db: IconScoreDatabase):
         self._name = Swap._NAME
+        self._record = VarDB(f'{self._name}_RECORD_{uid}', db, value_type=bytes)
+        # Swaps created before v0.5.0 use one VarDB per field until they get packed
         self._maker_order_id = VarDB(f'{self._name}_MAKER_ORDER_ID_{uid}', db, value_type=int)
         self._taker_order_id = VarDB(f'{self._name}_TAKER_ORDER_ID_{uid}', db, value_type=int)
         self._status = VarDB(f'{self._name}_STATUS_{uid}', db, value_type=int)
         self._timestamp_create = VarDB(f'{self._name}_TIMESTAMP_CREATE_{uid}', db, value_type=int)
         self._timestamp_swap = VarDB(f'{self._name}_TIMESTAMP_SWAP_{uid}', db, value_type=int)
         self._transaction = VarDB(f'{self._name}_TRANSACTION_{uid}', db, value_type=str)
+        self._legacy = {
+            'maker_order_id': self._maker_order_id,
+            'taker_order_id': self._taker_order_id,
+            'status': self._status,
+            'timestamp_create': self._timestamp_create,
+            'timestamp_swap': self._timestamp_swap,
+            'transaction': self._transaction
+        }
+        # Fields and orders are lazily loaded
+        self._fields = {}
+        self._packed = None
+        self._orders = None
         self._uid = uid
         self._db = db
 
+    # ================================================
+    #  Storage
+    # ================================================
+    def _is_packed(self) -> bool:
+        if self._packed is None:
+            record = self._record.get()
+            self._packed = record is not None
+            if self._packed:
+                self._fields = dict(zip(Swap._FIELDS, PackedRecord.unpack(record, Swap._TYPES)))
+        return self._packed
+
+    def _get(self, field: str):
+        if field not in self._fields:
+            if self._is_packed():
+                return self._fields[field]
+            self._fields[field] = self._legacy[field].get()
+        return self._fields[field]
+
+    def _save(self, fields: dict) -> None:
+        self._fields = fields
+        self._packed = True
+        self._record.set(PackedRecord.pack([fields[field] for field in Swap._FIELDS], Swap._TYPES))
+
+    def _update(self, **fields) -> None:
+        if self._is_packed():
+            self._fields.update(fields)
+            self._save(self._fields)
+        else:
+            for field, value in fields.items():
+                self._legacy[field].set(value)
+                self._fields[field] = value
+
+    def exists(self) -> bool:
+        return self._get('maker_order_id') != 0
+
+    def is_packed(self) -> bool:
+        return self._is_packed()
+
+    def pack(self) -> None:
+        """ Convert a legacy swap and its orders to packed records """
+        maker, taker = self.get_orders()
+        maker.pack()
+        taker.pack()
+        if self._is_packed():
+            return
+        self._save({field: self._get(field) for field in Swap._FIELDS})
+        for var in self._legacy.values():
+            var.remove()
+
     # ================================================
     #  Checks
     # ================================================
+    def check_exists(self) -> None:
+        # Swap ids are generated sequentially, and deleted swaps don't have a record anymore
+        if not SwapFactory(self._db).is_issued(self._uid) or not self.exists():
+            raise SwapNotFound(self._uid)
+
     def check_status(self, status: int) -> None:
-        if self._status.get() != status:
+        if self.status() != status:
             raise InvalidSwapStatus(
                 f'{self._name}_{self._uid}',
-                Utils.enum_names(SwapStatus)[self._status.get()],
+                Utils.enum_names(SwapStatus)[self.status()],
                 Utils.enum_names(SwapStatus)[status])
 
     def check_maker_address(self, maker_address: Address) -> None:
-        maker_provider = Order(self._maker_order_id.get(), self._db).provider()
+        maker, taker = self.get_orders()
+        maker_provider = maker.provider()
         if maker_provider != maker_address:
             raise InvalidOrderProvider(maker_provider)
 
@@ -100,27 +182,32 @@ class Swap(object):
     def id(self) -> int:
         return self._uid
 
+    def status(self) -> int:
+        return self._get('status')
+
     def set_status(self, status: int) -> None:
-        self._status.set(status)
+        self._update(status=status)
 
     def set_transaction(self, transaction: str) -> None:
-        self._transaction.set(transaction)
+        self._update(transaction=transaction)
 
     def set_timestamp_swap(self, time: int) -> None:
-        self._timestamp_swap.set(time)
+        self._update(timestamp_swap=time)
 
     def get_orders(self) -> tuple:
-        maker = Order(self._maker_order_id.get(), self._db)
-        taker = Order(self._taker_order_id.get(), self._db)
-        return (maker, taker)
+        if self._orders is None:
+            maker = Order(self._get('maker_order_id'), self._db)
+            taker = Order(self._get('taker_order_id'), self._db)
+            self._orders = (maker, taker)
+        return self._orders
 
-    def get_price(self) -> float:
+    def get_price(self) -> Price:
         maker, taker = self.get_orders()
-        return maker.amount() / taker.amount()
+        return Price(maker.amount(), taker.amount())
 
-    def get_inverted_price(self) -> float:
+    def get_inverted_price(self) -> Price:
         maker, taker = self.get_orders()
-        return taker.amount() / maker.amount()
+        return Price(taker.amount(), maker.amount())
 
     def is_private(self) -> bool:
         maker, taker = self.get_orders()
@@ -132,19 +219,16 @@ class Swap(object):
             'id': self._uid,
             'maker': maker.serialize(),
             'taker': taker.serialize(),
-            'status': Utils.enum_names(SwapStatus)[self._status.get()],
-            'timestamp_create': self._timestamp_create.get(),
-            'timestamp_swap': self._timestamp_swap.get(),
-            'transaction': self._transaction.get()
+            'status': Utils.enum_names(SwapStatus)[self.status()],
+            'timestamp_create': self._get('timestamp_create'),
+            'timestamp_swap': self._get('timestamp_swap'),
+            'transaction': self._get('transaction')
         }
 
     def delete(self) -> None:
         maker, taker = self.get_orders()
         maker.delete()
         taker.delete()
-        self._maker_order_id.remove()
-        self._taker_order_id.remove()
-        self._status.remove()
-        self._timestamp_create.remove()
-        self._timestamp_swap.remove()
-        self._transaction.remove()
+        self._record.remove()
+        for var in self._legacy.values():
+            var.remove()
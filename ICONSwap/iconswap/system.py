@@ -19,6 +19,10 @@ from iconservice import *
 from ..scorelib.set import *
 
 
+# The registries of all the swaps and orders created before v0.5.0.
+# Existence is now checked with the id factories, so they're only kept
+# until they're deleted by the operator (see delete_system_sets)
+
 class SystemSwapDB(SetDB):
     _NAME = 'SYSTEM_SWAP_DB'
 
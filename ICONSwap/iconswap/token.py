@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 ICONation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from iconservice import *
+from ..scorelib.packed import *
+
+
+class TokenRegistry:
+    """ TokenRegistry stores the name, symbol and decimals of the traded tokens,
+        so they don't need to be requested to the token contracts during a call.
+        Tokens are registered when whitelisted, and may be refreshed by the operator.
+    """
+
+    _NAME = 'TOKEN_REGISTRY'
+
+    # Fields of the packed record, in storage order
+    _FIELDS = ('name', 'symbol', 'decimals')
+    _TYPES = (str, str, int)
+
+    def __init__(self, db: IconScoreDatabase):
+        self._name = TokenRegistry._NAME
+        # Token contract => packed record
+        self._tokens = DictDB(f'{self._name}_TOKENS', db, value_type=bytes)
+        self._db = db
+
+    def register(self, contract: Address, name: str, symbol: str, decimals: int) -> None:
+        self._tokens[str(contract)] = PackedRecord.pack([name, symbol, decimals], TokenRegistry._TYPES)
+
+    def find(self, contract: Address) -> dict:
+        """ Returns the token information, or None if the token isn't registered """
+        record = self._tokens[str(contract)]
+        if not record:
+            return None
+        return dict(zip(TokenRegistry._FIELDS, PackedRecord.unpack(record, TokenRegistry._TYPES)))
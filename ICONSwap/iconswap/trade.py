@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 ICONation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from iconservice import *
+from .consts import *
+from ..scorelib.id_factory import *
+from ..scorelib.packed import *
+
+# ================================================
+#  Exception
+# ================================================
+
+
+class TradeNotFound(Exception):
+    pass
+
+
+class TradeFactory(IdFactory):
+
+    _NAME = 'TRADE_FACTORY'
+
+    def __init__(self, db: IconScoreDatabase):
+        name = TradeFactory._NAME
+        super().__init__(name, db)
+        self._name = name
+        self._db = db
+
+    def create(self, swap_id: int,
+               maker_amount: int,
+               taker_amount: int,
+               taker_address: Address,
+               timestamp: int,
+               transaction: str) -> int:
+
+        trade_id = self.get_uid()
+        trade = Trade(trade_id, self._db)
+        trade._save({
+            'swap_id': swap_id,
+            'maker_amount': maker_amount,
+            'taker_amount': taker_amount,
+            'taker_address': taker_address,
+            'timestamp': timestamp,
+            'transaction': transaction
+        })
+
+        return trade_id
+
+
+class Trade(object):
+    """ Trade is the record of a partial fill of a swap, the swap itself
+        remains pending with the amounts left.
+    """
+
+    _NAME = 'TRADE'
+
+    # Fields of the packed record, in storage order
+    _FIELDS = ('swap_id', 'maker_amount', 'taker_amount', 'taker_address', 'timestamp', 'transaction')
+    _TYPES = (int, int, int, Address, int, str)
+
+    # ================================================
+    #  Initialization
+    # ================================================
+    def __init__(self, uid: int, db: IconScoreDatabase):
+        self._name = Trade._NAME
+        self._record = VarDB(f'{self._name}_RECORD_{uid}', db, value_type=bytes)
+        # Fields are lazily loaded
+        self._fields = None
+        self._uid = uid
+        self._db = db
+
+    # ================================================
+    #  Storage
+    # ================================================
+    def _load(self) -> dict:
+        if self._fields is None:
+            record = self._record.get()
+            self._fields = dict(zip(Trade._FIELDS, PackedRecord.unpack(record, Trade._TYPES))) if record else {}
+        return self._fields
+
+    def _save(self, fields: dict) -> None:
+        self._fields = fields
+        self._record.set(PackedRecord.pack([fields[field] for field in Trade._FIELDS], Trade._TYPES))
+
+    def exists(self) -> bool:
+        return bool(self._load())
+
+    # ================================================
+    #  Checks
+    # ================================================
+    def check_exists(self) -> None:
+        if not TradeFactory(self._db).is_issued(self._uid) or not self.exists():
+            raise TradeNotFound(self._uid)
+
+    # ================================================
+    #  Public Methods
+    # ================================================
+    def id(self) -> int:
+        return self._uid
+
+    def swap_id(self) -> int:
+        return self._load()['swap_id']
+
+    def serialize(self) -> dict:
+        fields = self._load()
+        return {
+            'id': self._uid,
+            'swap_id': fields['swap_id'],
+            'maker_amount': fields['maker_amount'],
+            'taker_amount': fields['taker_amount'],
+            'taker_address': str(fields['taker_address']),
+            'timestamp': fields['timestamp'],
+            'transaction': fields['transaction']
+        }
+
+
+class SwapTradeDB:
+    """ SwapTradeDB is the list of the trades of a swap, in chronological order """
+
+    _NAME = 'SWAP_TRADE_DB'
+
+    def __init__(self, swap_id: int, db: IconScoreDatabase):
+        self._name = f'{SwapTradeDB._NAME}_{swap_id}'
+        self._trades = ArrayDB(f'{self._name}_TRADES', db, value_type=int)
+        self._db = db
+
+    def __len__(self) -> int:
+        return len(self._trades)
+
+    def __iter__(self):
+        return iter(self._trades)
+
+    def add(self, trade_id: int) -> None:
+        self._trades.put(trade_id)
+
+    def select(self, offset: int) -> list:
+        """ Returns a limited amount of trade ids """
+        length = len(self._trades)
+
+        if offset > length:
+            # Offset is bigger than the number of trades
+            raise StopIteration(self._name)
+
+        # Do a maximum iteration count of MAX_ITERATION_LOOP
+        return [self._trades[index] for index in range(offset, min(offset + MAX_ITERATION_LOOP, length))]
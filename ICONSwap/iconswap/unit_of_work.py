@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 ICONation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from iconservice import *
+from .swap import *
+from ..checks import *
+
+
+class UnitOfWork:
+    """ UnitOfWork is an identity map of the swaps loaded during an external call.
+        A given swap is only instantiated once, so its fields and its orders
+        are only read once from the state DB. Writes are immediately
+        forwarded to the state DB, so the cache never needs to be flushed.
+        The information of the tokens is also only loaded once per call.
+    """
+
+    def __init__(self, db: IconScoreDatabase):
+        self._swaps = {}
+        self._tokens = {}
+        self._db = db
+
+    def swap(self, swap_id: int) -> Swap:
+        swap = self._swaps.get(swap_id)
+        if swap is None:
+            swap = Swap(swap_id, self._db)
+            self._swaps[swap_id] = swap
+        return swap
+
+    def token(self, contract: Address, load) -> dict:
+        if contract not in self._tokens:
+            self._tokens[contract] = load(contract)
+        return self._tokens[contract]
+
+
+def unit_of_work(func):
+    """ Give the external call its own UnitOfWork, discarded when the call ends """
+    if not isfunction(func):
+        raise NotAFunctionError
+
+    @wraps(func)
+    def __wrapper(self: object, *args, **kwargs):
+        previous = self._unit_of_work
+        self._unit_of_work = UnitOfWork(self.db)
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self._unit_of_work = previous
+
+    return __wrapper
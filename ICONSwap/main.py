@@ -19,11 +19,16 @@ from .checks import *
 from .version import *
 from .consts import *
 from .maintenance import *
+from .trace import *
 from .iconswap.system import *
 from .iconswap.market import *
 from .iconswap.account import *
 from .iconswap.swap import *
 from .iconswap.order import *
+from .iconswap.unit_of_work import *
+from .iconswap.settlement import *
+from .iconswap.trade import *
+from .iconswap.token import *
 from .iconswap.whitelist import *
 from .interfaces.irc2 import *
 
@@ -32,6 +37,14 @@ class InvalidCallParameters(Exception):
     pass
 
 
+class InvalidBatchSize(Exception):
+    pass
+
+
+class InvalidBatchAmount(Exception):
+    pass
+
+
 class ICONSwap(IconScoreBase):
     """ ICONSwap SCORE Base implementation """
 
@@ -68,6 +81,14 @@ class ICONSwap(IconScoreBase):
     def OrderRefundedEvent(self, order_id: int) -> None:
         pass
 
+    @eventlog(indexed=1)
+    def MarketOrderSweptEvent(self, maker_address: Address, fills: int, last_swap_id: int, remainder: int, capped: bool) -> None:
+        pass
+
+    @eventlog(indexed=2)
+    def TradeEvent(self, trade_id: int, swap_id: int, maker_amount: int, taker_amount: int, taker_address: Address) -> None:
+        pass
+
     @eventlog
     def ShowException(self, exception: str):
         pass
@@ -78,6 +99,13 @@ class ICONSwap(IconScoreBase):
     def __init__(self, db: IconScoreDatabase) -> None:
         super().__init__(db)
         self._iconbet_wages = VarDB(f'{ICONSwap._NAME}_ICONBET_WAGES', db, value_type=Address)
+        # Swaps with an ID lower or equal than this one may not be packed yet
+        self._legacy_swap_id_max = VarDB(f'{ICONSwap._NAME}_LEGACY_SWAP_ID_MAX', db, value_type=int)
+        self._packed_swap_id_cursor = VarDB(f'{ICONSwap._NAME}_PACKED_SWAP_ID_CURSOR', db, value_type=int)
+        # Swaps loaded during the current external call, see unit_of_work
+        self._unit_of_work = None
+        # Funds owed to the maker of the current market order or batch cancel, see _settle
+        self._settlement = None
 
     def on_install(self) -> None:
         super().on_install()
@@ -99,6 +127,9 @@ class ICONSwap(IconScoreBase):
         if version.is_less_than_target_version('0.4.2'):
             self._migrate_v0_4_2()
 
+        if version.is_less_than_target_version('0.5.0'):
+            self._migrate_v0_5_0()
+
         version.update(VERSION)
 
     # ================================================
@@ -106,14 +137,16 @@ class ICONSwap(IconScoreBase):
     # ================================================
     def _migrate_v0_4_0(self) -> None:
         # 'None' taker order provider field needs to be updated to EMPTY_ORDER_PROVIDER
-        for swap_id in SystemSwapDB(self.db):
-            swap = Swap(swap_id, self.db)
+        for swap_id in range(1, SwapFactory(self.db).get_last_uid() + 1):
+            swap = self._get_swap(swap_id)
             maker, taker = swap.get_orders()
             if taker.provider() == None and taker.status() in [OrderStatus.EMPTY, OrderStatus.CANCELLED]:
                 taker._provider.set(EMPTY_ORDER_PROVIDER)
 
     def _migrate_v0_4_1(self) -> None:
         # Market sellers should be reversed for all markets
+        # Since v0.5.0, the order books are sorted again while being migrated
+        # to the skip lists, so this migration doesn't have any effect anymore
         for pair in MarketPairsDB(self.db):
             pair = pair.split('/')
             # Get the list of selling pending swaps
@@ -124,28 +157,105 @@ class ICONSwap(IconScoreBase):
 
             # Add them again to the DB in the correct order
             for old_swap in pendings:
-                MarketPendingSwapDB(pair, self.db).add(old_swap)
+                MarketPendingSwapDB(pair, self.db).add(Swap(old_swap, self.db))
 
     def _migrate_v0_4_2(self) -> None:
         self._iconbet_wages.set(ICONBET_WAGES_ADDRESS)
 
+    def _migrate_v0_5_0(self) -> None:
+        # Market sides are now stored in skip lists
+        for pair in MarketPairsDB(self.db):
+            pair = pair.split('/')
+            # The swaps are moved in chunks by the operator (see migrate_market_book),
+            # the order books are read from the legacy linked lists until then
+            MarketPendingSwapDB(pair, self.db).start_legacy_migration()
+
+            # Markets now have a summary, their volumes are only counted from now on
+            last_swap = self._get_market_last_filled_swap(pair)
+            if last_swap:
+                maker, taker = last_swap.get_orders()
+                is_buyer = MarketPairsDB.is_buyer(pair, maker.contract())
+                last_price = last_swap.get_price() if is_buyer else last_swap.get_inverted_price()
+                MarketSummaryDB(pair, self.db).set_last_trade(last_price.reduced().key(), len(MarketFilledSwapDB(pair, self.db)))
+
+        # Sets now store the position of their items
+        for small_set in (Whitelist(self.db), MarketPairsDB(self.db)):
+            small_set.build_index(len(small_set))
+
+        # Tokens information is now stored in a registry
+        contracts = set(Whitelist(self.db))
+        for pair in MarketPairsDB(self.db):
+            contracts.update(map(Address.from_string, pair.split('/')))
+        for contract in contracts:
+            self._register_token(contract)
+
+        # Swaps and orders are now stored as packed records.
+        # Existing records are converted in chunks by the operator (see migrate_packed_records)
+        self._legacy_swap_id_max.set(SwapFactory(self.db).get_last_uid())
+
     # ================================================
     #  Internal methods
     # ================================================
+    def _get_swap(self, swap_id: int) -> Swap:
+        if self._unit_of_work:
+            return self._unit_of_work.swap(swap_id)
+        return Swap(swap_id, self.db)
+
+    def _serialize_swaps_page(self, swap_ids: list) -> dict:
+        # Pages following a swap ID cost the same whatever their position in the list.
+        # The cursor of the next page is the last swap of a full page, 0 otherwise
+        return {
+            'swaps': [self._get_swap(swap_id).serialize() for swap_id in swap_ids],
+            'cursor': swap_ids[-1] if len(swap_ids) == MAX_ITERATION_LOOP else 0
+        }
+
+    def _serialize_market_swaps_page(self, swap_ids: list, cursor: str) -> dict:
+        # Order book cursors are positions in the book, see _MarketSidePendingSwapDB.select_after
+        return {
+            'swaps': [self._get_swap(swap_id).serialize() for swap_id in swap_ids],
+            'cursor': cursor
+        }
+
     def _transfer_order(self, order: Order, dest: Address) -> None:
         return self._transfer_funds(order.contract(), order.amount(), dest)
 
     def _transfer_funds(self, contract: Address, amount: int, dest: Address) -> None:
+        if self._settlement and dest == self._settlement.address():
+            # Paid at the end of the market order
+            self._settlement.add(contract, amount)
+            return
+
         if self._is_contract_icx(contract):
             self.icx.transfer(dest, amount)
         else:
             irc2 = self.create_interface_score(contract, IRC2Interface)
             irc2.transfer(dest, amount)
 
+    def _settle(self) -> None:
+        """ Pay the accumulated funds, with one transfer per token """
+        settlement = self._settlement
+        self._settlement = None
+        for contract, amount in settlement.items():
+            if amount > 0:
+                self._transfer_funds(contract, amount, settlement.address())
+
+    def _get_market_price(self, key: str) -> float:
+        # Market prices are stored in quote per base
+        if not key:
+            return float(0)
+        return float(MarketPendingSwapDB.key_price(key))
+
+    def _get_market_last_price(self, key: str) -> float:
+        # The last price has always been displayed in base per quote
+        if not key:
+            return float(0)
+        price = MarketPendingSwapDB.key_price(key)
+        return float(Price(price.denominator(), price.numerator()))
+
     def _get_market_last_filled_swap(self, pair: tuple) -> Swap:
-        filled_swaps = MarketFilledSwapDB(pair, self.db).select(0)
-        if filled_swaps:
-            return Swap(filled_swaps[0], self.db)
+        swap_id = next(iter(MarketFilledSwapDB(pair, self.db)), None)
+        if swap_id:
+            return self._get_swap(swap_id)
 
     def _refund_order(self, order: Order) -> None:
         self._transfer_order(order, order.provider())
@@ -157,13 +267,33 @@ class ICONSwap(IconScoreBase):
     def _is_contract_icx(self, contract: Address) -> bool:
         return contract == ZERO_SCORE_ADDRESS
 
-    def _is_cleanable(self, maker_contract: Address, maker_amount: int) -> bool:
-        if self._is_contract_icx(maker_contract):
-            maker_decimals = ICX_TOKEN_DECIMALS
-        else:
-            maker_decimals = self.create_interface_score(maker_contract, IRC2Interface).decimals()
+    def _request_token(self, contract: Address) -> dict:
+        if self._is_contract_icx(contract):
+            return {'name': 'ICX', 'symbol': 'ICX', 'decimals': ICX_TOKEN_DECIMALS}
+
+        irc2 = self.create_interface_score(contract, IRC2Interface)
+        return {'name': irc2.name(), 'symbol': irc2.symbol(), 'decimals': irc2.decimals()}
+
+    def _register_token(self, contract: Address) -> None:
+        token = self._request_token(contract)
+        TokenRegistry(self.db).register(contract, token['name'], token['symbol'], token['decimals'])
+
+    def _get_token(self, contract: Address) -> dict:
+        def load(contract: Address) -> dict:
+            if self._is_contract_icx(contract):
+                return self._request_token(contract)
+            # Only the tokens that have never been whitelisted are requested to their contract
+            return TokenRegistry(self.db).find(contract) or self._request_token(contract)
 
-        return 0 < maker_amount < (10**maker_decimals)
+        if self._unit_of_work:
+            return self._unit_of_work.token(contract, load)
+        return load(contract)
+
+    def _get_decimals(self, contract: Address) -> int:
+        return self._get_token(contract)['decimals']
+
+    def _is_cleanable(self, maker_contract: Address, maker_amount: int) -> bool:
+        return 0 < maker_amount < (10**self._get_decimals(maker_contract))
 
     def _is_order_cleanable(self, order: Order) -> bool:
         return self._is_cleanable(order.contract(), order.amount())
@@ -173,7 +303,6 @@ class ICONSwap(IconScoreBase):
 
         # Low swap amount, cancel the swap back to the maker
         if (self._is_order_cleanable(maker) or self._is_order_cleanable(taker)):
-            Logger.warning(f"LOW SWAP, CANCEL : {swap.serialize()}")
             self._cancel_swap(swap)
             self.SwapCleanupEvent(swap.id())
 
@@ -182,19 +311,33 @@ class ICONSwap(IconScoreBase):
 
         # Split the swaps
         maker_partial_amount = (taker_partial_amount * maker.amount()) // taker.amount()
+        self._check_amount(maker_partial_amount)
+
+        # Record the trade on the swap, and for both parties
+        trade_id = TradeFactory(self.db).create(swap.id(),
+                                                maker_partial_amount,
+                                                taker_partial_amount,
+                                                taker_address,
+                                                self.now(),
+                                                self.tx.hash.hex())
+        SwapTradeDB(swap.id(), self.db).add(trade_id)
+        pair = (maker.contract(), taker.contract())
+        for provider in self._get_distinct_providers(maker.provider(), taker_address):
+            AccountTradeDB(provider, self.db).prepend(trade_id)
+            AccountPairTradeDB(provider, pair, self.db).prepend(trade_id)
 
-        # Create a partial swap and fill it
-        partial_swap = self._create_swap(maker.contract(),
-                                         maker_partial_amount,
-                                         taker.contract(),
-                                         taker_partial_amount,
-                                         maker.provider(),
-                                         taker_address)
-        if partial_swap:
-            self._do_full_fill_swap(partial_swap, taker_address)
-            # Adjust the amount of the remaining existing swap
-            maker.partial_fill(maker_partial_amount)
-            taker.partial_fill(taker_partial_amount)
+        # Trade the tokens
+        self._transfer_funds(maker.contract(), maker_partial_amount, taker_address)
+        self._transfer_funds(taker.contract(), taker_partial_amount, maker.provider())
+        self.TradeEvent(trade_id, swap.id(), maker_partial_amount, taker_partial_amount, taker_address)
+
+        # Adjust the amount of the remaining existing swap
+        if not swap.is_private():
+            # Keep the price level amounts of the order book up to date
+            MarketPendingSwapDB(pair, self.db).partial_fill(swap, maker_partial_amount, taker_partial_amount)
+            MarketSummaryDB(pair, self.db).add_trade(maker.contract(), maker_partial_amount, taker_partial_amount)
+        maker.partial_fill(maker_partial_amount)
+        taker.partial_fill(taker_partial_amount)
 
         # Cleanup decimals if needed
         self._cleanup_swap(swap)
@@ -211,8 +354,8 @@ class ICONSwap(IconScoreBase):
                       or if the trade isn't pending anymore, the funds will be sent back to this address
         """
         # Check if swap exists
-        SystemSwapDB(self.db).check_exists(swap_id)
-        swap = Swap(swap_id, self.db)
+        swap = self._get_swap(swap_id)
+        swap.check_exists()
 
         # Check if the swap is pending
         swap.check_status(SwapStatus.PENDING)
@@ -236,6 +379,12 @@ class ICONSwap(IconScoreBase):
         else:
             self._do_full_fill_swap(swap, taker_address)
 
+    def _get_distinct_providers(self, maker_address: Address, taker_address: Address) -> list:
+        """ Returns the distinct providers of the orders of a swap or a trade """
+        if maker_address == taker_address:
+            return [maker_address]
+        return [maker_address, taker_address]
+
     def _do_full_fill_swap(self, swap: Swap, taker_address: Address) -> None:
         # Swap needs to be checked for private *before* the taker order is filled
         is_private_swap = swap.is_private()
@@ -260,15 +409,15 @@ class ICONSwap(IconScoreBase):
         AccountPendingSwapDB(maker.provider(), self.db).remove(swap.id())
         AccountPairPendingSwapDB(maker.provider(), pair, self.db).remove(swap.id())
         if not is_private_swap:
-            MarketPendingSwapDB(pair, self.db).remove(swap.id())
+            MarketPendingSwapDB(pair, self.db).remove(swap)
 
-        # Add the swap to filled lists
-        AccountFilledSwapDB(maker.provider(), self.db).prepend(swap.id())
-        AccountFilledSwapDB(taker.provider(), self.db).prepend(swap.id())
-        AccountPairFilledSwapDB(maker.provider(), pair, self.db).prepend(swap.id())
-        AccountPairFilledSwapDB(taker.provider(), pair, self.db).prepend(swap.id())
+        # Add the swap to filled lists, only once for a maker filling its own swap
+        for provider in self._get_distinct_providers(maker.provider(), taker.provider()):
+            AccountFilledSwapDB(provider, self.db).prepend(swap.id())
+            AccountPairFilledSwapDB(provider, pair, self.db).prepend(swap.id())
         if not is_private_swap:
             MarketFilledSwapDB(pair, self.db).prepend(swap.id())
+            MarketSummaryDB(pair, self.db).add_trade(maker.contract(), maker.amount(), taker.amount())
 
         # Set the orders as successful
         maker.set_status(OrderStatus.SUCCESS)
@@ -284,7 +433,9 @@ class ICONSwap(IconScoreBase):
                      taker_contract: Address,
                      taker_amount: int,
                      maker_address: Address,
-                     taker_address: Address) -> Swap:
+                     taker_address: Address,
+                     pending_swaps: MarketPendingSwapDB = None) -> Swap:
+        """ pending_swaps: The order book of the pair, if it is shared by the swaps of a batch """
         # Input checks
         self._check_contract(maker_contract)
         self._check_contract(taker_contract)
@@ -303,20 +454,17 @@ class ICONSwap(IconScoreBase):
 
         # Create orders and swap
         order_factory = OrderFactory(self.db)
-        maker_id = order_factory.create(maker_contract, maker_amount)
-        taker_id = order_factory.create(taker_contract, taker_amount, taker_address)
+        maker_id, taker_id = order_factory.get_uids(2)
+        order_factory.init(maker_id, maker_contract, maker_amount)
+        order_factory.init(taker_id, taker_contract, taker_amount, taker_address)
         swap_id = SwapFactory(self.db).create(maker_id, taker_id, self.now(), maker_address)
-        swap = Swap(swap_id, self.db)
-
-        # Add to DBs
-        system_order_db = SystemOrderDB(self.db)
-        system_order_db.add(maker_id)
-        system_order_db.add(taker_id)
-        SystemSwapDB(self.db).add(swap_id)
+        swap = self._get_swap(swap_id)
 
         if not swap.is_private():
             # Market is only for public swaps
-            MarketPendingSwapDB(pair, self.db).add(swap_id)
+            if pending_swaps is None:
+                pending_swaps = MarketPendingSwapDB(pair, self.db)
+            pending_swaps.add(swap)
 
             # Create the market pair if it didn't exist yet
             market_pairs_db = MarketPairsDB(self.db)
@@ -329,7 +477,7 @@ class ICONSwap(IconScoreBase):
         AccountPairPendingSwapDB(maker_address, pair, self.db).prepend(swap_id)
 
         # Funds have been sent for maker
-        maker = Order(maker_id, self.db)
+        maker, taker = swap.get_orders()
         maker.fill(maker_address)
 
         # Trigger events
@@ -338,6 +486,23 @@ class ICONSwap(IconScoreBase):
 
         return swap
 
+    @settlement_scope
+    def _cancel_maker_swaps(self, maker_address: Address, swap_ids: list) -> None:
+        # The maker is refunded once per token, after all the swaps have been cancelled
+        self._settlement = Settlement(maker_address)
+
+        for swap_id in swap_ids:
+            swap = self._get_swap(swap_id)
+            swap.check_exists()
+
+            # Only the maker can cancel the swap
+            maker, taker = swap.get_orders()
+            maker.check_provider(maker_address)
+
+            self._cancel_swap(swap)
+
+        self._settle()
+
     def _cancel_swap(self, swap: Swap) -> None:
         # Swap must be pending
         swap.check_status(SwapStatus.PENDING)
@@ -367,7 +532,7 @@ class ICONSwap(IconScoreBase):
 
         if not swap.is_private():
             # Market is only for public swaps
-            MarketPendingSwapDB(pair, self.db).remove(swap.id())
+            MarketPendingSwapDB(pair, self.db).remove(swap)
 
         # Set the orders as unavailable
         maker.set_status(OrderStatus.CANCELLED)
@@ -380,7 +545,8 @@ class ICONSwap(IconScoreBase):
         maker_contract = self.msg.sender
         maker_amount = _value
         maker_address = _from
-        self._market_create_limit_order(taker_contract, taker_amount, maker_contract, maker_amount, maker_address)
+        mode = int(params.get('mode', hex(MarketOrderMode.GOOD_TILL_CANCELLED)), 16)
+        self._market_create_limit_order(taker_contract, taker_amount, maker_contract, maker_amount, maker_address, mode)
 
     def _create_irc2_swap(self, _value: int, _from: Address, params: dict) -> None:
         maker_contract = self.msg.sender
@@ -391,6 +557,44 @@ class ICONSwap(IconScoreBase):
         taker_address = Address.from_string(params['taker_address']) if 'taker_address' in params else EMPTY_ORDER_PROVIDER
         self._create_swap(maker_contract, maker_amount, taker_contract, taker_amount, maker_address, taker_address)
 
+    def _create_irc2_swaps(self, _value: int, _from: Address, params: dict) -> None:
+        maker_contract = self.msg.sender
+        maker_amount = _value
+        maker_address = _from
+        self._create_swaps(maker_contract, maker_amount, maker_address, params['swaps'])
+
+    def _create_swaps(self, maker_contract: Address, maker_amount: int, maker_address: Address, swaps: list) -> None:
+        """
+            Create several swaps funded by a single deposit
+            swaps: The list of swaps to create, each one of them being a dict with
+                   the maker_amount, taker_contract and taker_amount (hex encoded),
+                   and an optional taker_address.
+                   The sum of the maker amounts needs to match the deposit.
+        """
+        if not 0 < len(swaps) <= MAX_BATCH_SWAPS:
+            raise InvalidBatchSize(len(swaps))
+
+        maker_amounts = [int(swap['maker_amount'], 16) for swap in swaps]
+        if sum(maker_amounts) != maker_amount:
+            raise InvalidBatchAmount(maker_amount, sum(maker_amounts))
+
+        # Swaps of the same pair share their order book, so the price levels
+        # read while inserting a swap are reused by the following ones
+        order_books = {}
+
+        for swap, swap_maker_amount in zip(swaps, maker_amounts):
+            taker_contract = Address.from_string(swap['taker_contract'])
+            taker_amount = int(swap['taker_amount'], 16)
+            taker_address = Address.from_string(swap['taker_address']) if 'taker_address' in swap else EMPTY_ORDER_PROVIDER
+            pair = (maker_contract, taker_contract)
+            pair_name = MarketPairsDB.get_pair_name(pair)
+            if pair_name not in order_books:
+                order_books[pair_name] = MarketPendingSwapDB(pair, self.db)
+            self._create_swap(maker_contract, swap_maker_amount,
+                              taker_contract, taker_amount,
+                              maker_address, taker_address,
+                              order_books[pair_name])
+
     def _fill_irc2_order(self, _value: int, _from: Address, params: dict) -> None:
         taker_contract = self.msg.sender
         taker_amount = _value
@@ -431,6 +635,7 @@ class ICONSwap(IconScoreBase):
 
     @catch_error
     @check_maintenance
+    @unit_of_work
     @external
     def tokenFallback(self, _from: Address, _value: int, _data: bytes) -> None:
         """
@@ -451,11 +656,25 @@ class ICONSwap(IconScoreBase):
                     "taker_amount": The amount of taker token required (hex encoded)
                 }
 
+                Create several IRC2 Swaps with a single deposit:
+                {
+                    "action": "create_irc2_swaps",
+                    "swaps": A list of swaps, see _create_swaps
+                }
+
                 Fill IRC2 Taker Order:
                 {
                     "action": "fill_irc2_order",
                     "swap_id": The Swap ID being filled (hex encoded)
                 }
+
+                Create IRC2 Market Limit Order:
+                {
+                    "action": "market_create_limit_irc2_order",
+                    "taker_contract": The taker token contract address being traded with the current token
+                    "taker_amount": The amount of taker token required (hex encoded)
+                    "mode": Optional MarketOrderMode, GOOD_TILL_CANCELLED by default (hex encoded)
+                }
         """
         if _data is None or _data == b'None':
             raise InvalidCallParameters('tokenFallback', 'data')
@@ -464,6 +683,8 @@ class ICONSwap(IconScoreBase):
 
         if params['action'] == 'create_irc2_swap':
             self._create_irc2_swap(_value, _from, params)
+        elif params['action'] == 'create_irc2_swaps':
+            self._create_irc2_swaps(_value, _from, params)
         elif params['action'] == 'fill_irc2_order':
             self._fill_irc2_order(_value, _from, params)
         elif params['action'] == 'market_create_limit_irc2_order':
@@ -473,10 +694,7 @@ class ICONSwap(IconScoreBase):
 
     def _cleanup_decimals_ex(self, contract: Address, amount: int) -> tuple:
 
-        decimals = ICX_TOKEN_DECIMALS if self._is_contract_icx(contract) \
-            else self.create_interface_score(contract, IRC2Interface).decimals()
-
-        divisor = 10**(decimals - SWAP_MAX_DECIMALS)
+        divisor = 10**(self._get_decimals(contract) - SWAP_MAX_DECIMALS)
         rounded_amount = amount // divisor
         float_amount = amount / divisor
 
@@ -499,129 +717,184 @@ class ICONSwap(IconScoreBase):
 
         # Refund maker if exceed
         if maker_exceed > 0:
-            Logger.warning(f"Maker exceed {maker_exceed} {maker_contract}")
             # Send back the exceed decimals to the maker
             self._transfer_funds(maker_contract, maker_exceed, maker_address)
 
         return (maker_amount, taker_amount)
 
+    @settlement_scope
     def _market_create_limit_order(self,
                                    taker_contract: Address,
                                    taker_amount: int,
                                    maker_contract: Address,
                                    maker_amount: int,
-                                   maker_address: Address) -> None:
-
-        Logger.warning(f"===============================================================================")
-        Logger.warning(f""" BEFORE :
-            taker_contract={taker_contract}
-            taker_amount={taker_amount}
-            maker_contract={maker_contract}
-            maker_amount={maker_amount}
-            maker_address={maker_address}
-        """)
-        Logger.warning(f"===============================================================================")
+                                   maker_address: Address,
+                                   mode: int) -> None:
+
+        MarketOrderMode.check_valid(mode)
+
+        trace = MatchTrace(self.db)
+        if trace.is_enabled():
+            trace.record('order',
+                         maker_contract=maker_contract, maker_amount=maker_amount,
+                         taker_contract=taker_contract, taker_amount=taker_amount,
+                         maker_address=maker_address, mode=mode)
+
+        # The market order maker is the taker of every swap filled by the sweep,
+        # the funds it receives are accumulated and paid once at the end
+        self._settlement = Settlement(maker_address)
 
         maker_amount, taker_amount = self._cleanup_decimals(maker_contract, maker_amount, taker_contract, taker_amount, maker_address)
-        Logger.warning(f"===============================================================================")
-        Logger.warning(f""" AFTER :
-            taker_amount={taker_amount}
-            maker_amount={maker_amount}
-        """)
-        Logger.warning(f"===============================================================================")
 
         pair = (maker_contract, taker_contract)
         pending_swaps = MarketPendingSwapDB(pair, self.db)
+        pending_swaps.check_migrated()
+        is_buyer = MarketPairsDB.is_buyer(pair, maker_contract)
 
-        # Convert the linked list as we're going it during iteration
-        if MarketPairsDB.is_buyer(pair, maker_contract):
-            Logger.warning("Buy Side")
-            swaps = list(pending_swaps.sellers())
-            limit_price = maker_amount / taker_amount
-
-            def taker_price_fn(remaining: int, limit_price: float) -> int:
-                return int(remaining // limit_price)
+        # The order book is read lazily, while its swaps are filled
+        if is_buyer:
+            side = pending_swaps.sellers()
+            limit_price = Price(maker_amount, taker_amount)
 
-            def swap_price_fn(swap: Swap) -> float:
-                return swap.get_inverted_price()
+            def taker_price_fn(remaining: int, limit_price: Price) -> int:
+                return limit_price.div(remaining)
 
-            def limit_fn(swap_price: int, limit_price: float) -> bool:
-                return round(swap_price, SWAP_MAX_DECIMALS) > round(limit_price, SWAP_MAX_DECIMALS)
+            def limit_fn(swap_price: Price, limit_price: Price) -> bool:
+                return swap_price > limit_price
 
         else:
-            Logger.warning("Sell Side")
-            swaps = list(pending_swaps.buyers())
-            limit_price = taker_amount / maker_amount
-
-            def taker_price_fn(remaining: int, limit_price: float) -> int:
-                return int(remaining * limit_price)
-
-            def swap_price_fn(swap: Swap) -> float:
-                return swap.get_price()
-
-            def limit_fn(swap_price: int, limit_price: float) -> bool:
-                return round(swap_price, SWAP_MAX_DECIMALS) < round(limit_price, SWAP_MAX_DECIMALS)
+            side = pending_swaps.buyers()
+            limit_price = Price(taker_amount, maker_amount)
+
+            def taker_price_fn(remaining: int, limit_price: Price) -> int:
+                return limit_price.mul(remaining)
+
+            def limit_fn(swap_price: Price, limit_price: Price) -> bool:
+                return swap_price < limit_price
+
+        if trace.is_enabled():
+            trace.record('decimals', maker_amount=maker_amount, taker_amount=taker_amount,
+                         side='buy' if is_buyer else 'sell', limit_price=limit_price)
+
+        if mode == MarketOrderMode.FILL_OR_KILL:
+            # Check the liquidity with the price levels totals, so a killed order doesn't write anything
+            can_fill = side.can_fill(maker_amount,
+                                     lambda swap_price: limit_fn(swap_price, limit_price),
+                                     MAX_MARKET_ORDER_FILLS,
+                                     lambda swap_id: self._get_swap(swap_id).get_orders()[1].amount())
+            if not can_fill:
+                if trace.is_enabled():
+                    trace.record('killed', maker_amount=maker_amount)
+                self._transfer_funds(maker_contract, maker_amount, maker_address)
+                self._settle()
+                self.MarketOrderSweptEvent(maker_address, 0, 0, maker_amount, False)
+                trace.flush()
+                return
 
         # Browse the order book and fill as much swaps as possible,
         # begginning with the cheapest swaps first, until:
         #   1) there is no more user funds left, or
         #   2) the user limit price is reached, or
-        #   3) the end of the order book is reached
+        #   3) the end of the order book is reached, or
+        #   4) MAX_MARKET_ORDER_FILLS swaps have been filled
         remaining = maker_amount
-        for swap_id in swaps:
-            swap = Swap(swap_id, self.db)
+        fills = 0
+        last_swap_id = 0
+        capped = False
+        for swap_id, price_key in side.sweep():
+            swap = self._get_swap(swap_id)
             maker, taker = swap.get_orders()
-            swap_price = swap_price_fn(swap)
-            Logger.warning(f"swap_price ={swap_price}")
-            Logger.warning(f"limit_price={limit_price}")
-            Logger.warning(f"CURSWAP={swap.serialize()}")
-
-            if remaining <= 0:
-                # 1) All funds have been spent on lower price swaps, stop
-                Logger.warning(f"STOP COND 1 (remaining: {remaining})")
-                break
+            # Both sides price keys are expressed in quote per base
+            swap_price = MarketPendingSwapDB.key_price(price_key)
 
             if limit_fn(swap_price, limit_price):
-                Logger.warning(f"STOP COND 2 (limit price reached : Sw:{round(swap_price, 7)} / Lim:{round(limit_price, 7)})")
                 # 2) User limit price is reached
-                # Create a new swap at this price and stop
+                # Handle the remainder at this price and stop
                 taker_amount = taker_price_fn(remaining, limit_price)
-                remaining, maker_exceed = self._cleanup_decimals_ex(maker_contract, remaining)
-                taker_amount, taker_exceed = self._cleanup_decimals_ex(taker_contract, taker_amount)
-                Logger.warning(f"------ \n Creating Swap : \n - {remaining / 10**ICX_TOKEN_DECIMALS} {maker_contract} for \n - {taker_amount / 10**ICX_TOKEN_DECIMALS} {taker_contract} \n - (P={limit_price})\n")
-                self._transfer_funds(maker_contract, maker_exceed, maker_address)
-                self._create_swap(maker_contract, remaining, taker_contract, taker_amount, maker_address, EMPTY_ORDER_PROVIDER)
+                self._market_order_remainder(trace, 'limit_reached', mode,
+                                             maker_contract, remaining, taker_contract, taker_amount, maker_address,
+                                             swap_id=swap_id, swap_price=swap_price)
                 break
 
             filling = min(taker.amount(), remaining)
-            Logger.warning(f"------ \n Filling Swap : \n - {filling / 10**ICX_TOKEN_DECIMALS} {maker_contract} for \n - {maker.amount() / 10**ICX_TOKEN_DECIMALS} {taker_contract} \n - (P={swap_price})\n")
+            if trace.is_enabled():
+                trace.record('fill', swap_id=swap_id, swap_price=swap_price,
+                             filling=filling, swap_amount=taker.amount())
             remaining -= taker.amount()
-            self._fill_swap(swap_id, maker_contract, filling, EMPTY_ORDER_PROVIDER)
+            self._fill_swap(swap_id, maker_contract, filling, maker_address)
+            fills += 1
+            last_swap_id = swap_id
+
+            if remaining <= 0:
+                # 1) All funds have been spent, stop before reading more swaps
+                if trace.is_enabled():
+                    trace.record('funds_spent', remaining=remaining)
+                break
+
+            if fills == MAX_MARKET_ORDER_FILLS:
+                # 4) Keep the cost of the order bounded and stop.
+                # The remainder cannot rest in the order book if it crosses the swaps left
+                capped = True
+                best_key = side.best_key()
+                crossing = best_key and not limit_fn(MarketPendingSwapDB.key_price(best_key), limit_price)
+                taker_amount = taker_price_fn(remaining, limit_price)
+                self._market_order_remainder(trace, 'fills_capped', mode,
+                                             maker_contract, remaining, taker_contract, taker_amount, maker_address,
+                                             can_rest=not crossing)
+                break
 
         else:
             # 3) End of the order book
-            Logger.warning(f"STOP COND 3 (end of order book) (remaining={remaining})")
             taker_amount = taker_price_fn(remaining, limit_price)
-            remaining, maker_exceed = self._cleanup_decimals_ex(maker_contract, remaining)
-            taker_amount, taker_exceed = self._cleanup_decimals_ex(taker_contract, taker_amount)
-            Logger.warning(f"------ \n Creating Swap : \n - {remaining / 10**ICX_TOKEN_DECIMALS} {maker_contract} for \n - {taker_amount / 10**ICX_TOKEN_DECIMALS} {taker_contract} \n - (P={limit_price})\n")
-            self._transfer_funds(maker_contract, maker_exceed, maker_address)
-            self._create_swap(maker_contract, remaining, taker_contract, taker_amount, maker_address, EMPTY_ORDER_PROVIDER)
-
-        Logger.warning("STOP")
+            self._market_order_remainder(trace, 'end_of_book', mode,
+                                         maker_contract, remaining, taker_contract, taker_amount, maker_address)
+
+        self._settle()
+        self.MarketOrderSweptEvent(maker_address, fills, last_swap_id, max(remaining, 0), capped)
+        trace.flush()
+
+    def _market_order_remainder(self,
+                                trace: MatchTrace,
+                                phase: str,
+                                mode: int,
+                                maker_contract: Address,
+                                remaining: int,
+                                taker_contract: Address,
+                                taker_amount: int,
+                                maker_address: Address,
+                                can_rest: bool = True,
+                                **fields) -> None:
+
+        if mode != MarketOrderMode.GOOD_TILL_CANCELLED or not can_rest:
+            # Refund the remainder rather than paying for a new resting swap.
+            # A fill-or-kill remainder is the rounding dust of a filled order
+            if trace.is_enabled():
+                trace.record(phase, **fields, refunded=remaining)
+            self._transfer_funds(maker_contract, remaining, maker_address)
+            return
+
+        # Create a new swap with the remainder
+        remaining, maker_exceed = self._cleanup_decimals_ex(maker_contract, remaining)
+        taker_amount, taker_exceed = self._cleanup_decimals_ex(taker_contract, taker_amount)
+        if trace.is_enabled():
+            trace.record(phase, **fields, maker_amount=remaining, taker_amount=taker_amount)
+        self._transfer_funds(maker_contract, maker_exceed, maker_address)
+        self._create_swap(maker_contract, remaining, taker_contract, taker_amount, maker_address, EMPTY_ORDER_PROVIDER)
 
     @catch_error
     @check_maintenance
+    @unit_of_work
     @external
     @payable
-    def market_create_limit_icx_order(self, taker_contract: Address, taker_amount: int) -> None:
+    def market_create_limit_icx_order(self, taker_contract: Address, taker_amount: int, mode: int = MarketOrderMode.GOOD_TILL_CANCELLED) -> None:
         maker_address = self.msg.sender
         maker_amount = self.msg.value
         maker_contract = ZERO_SCORE_ADDRESS
-        self._market_create_limit_order(taker_contract, taker_amount, maker_contract, maker_amount, maker_address)
+        self._market_create_limit_order(taker_contract, taker_amount, maker_contract, maker_amount, maker_address, mode)
 
     @catch_error
     @check_maintenance
+    @unit_of_work
     @external
     @payable
     def create_icx_swap(self, taker_contract: Address, taker_amount: int, taker_address: Address = EMPTY_ORDER_PROVIDER) -> None:
@@ -631,11 +904,23 @@ class ICONSwap(IconScoreBase):
 
     @catch_error
     @check_maintenance
+    @unit_of_work
+    @external
+    @payable
+    def create_icx_swaps(self, swaps: str) -> None:
+        """ swaps: A JSON encoded list of swaps, see _create_swaps """
+        maker_address = self.msg.sender
+        maker_amount = self.msg.value
+        self._create_swaps(ZERO_SCORE_ADDRESS, maker_amount, maker_address, json_loads(swaps))
+
+    @catch_error
+    @check_maintenance
+    @unit_of_work
     @external
     def cancel_swap(self, swap_id: int) -> None:
         # Check if swap exists
-        SystemSwapDB(self.db).check_exists(swap_id)
-        swap = Swap(swap_id, self.db)
+        swap = self._get_swap(swap_id)
+        swap.check_exists()
 
         # Only the maker can cancel the swap
         maker, taker = swap.get_orders()
@@ -645,6 +930,39 @@ class ICONSwap(IconScoreBase):
 
     @catch_error
     @check_maintenance
+    @unit_of_work
+    @external
+    def cancel_swaps(self, swap_ids: str) -> None:
+        """ swap_ids: A JSON encoded list of up to MAX_BATCH_SWAPS swap ids """
+        swap_ids = json_loads(swap_ids)
+        if not 0 < len(swap_ids) <= MAX_BATCH_SWAPS:
+            raise InvalidBatchSize(len(swap_ids))
+
+        self._cancel_maker_swaps(self.msg.sender, swap_ids)
+
+    @catch_error
+    @check_maintenance
+    @unit_of_work
+    @external
+    def cancel_account_swaps(self, pair: str, limit: int) -> None:
+        """ Cancel up to `limit` pending swaps of the sender on a given pair, the most recent first """
+        if not 0 < limit <= MAX_BATCH_SWAPS:
+            raise InvalidBatchSize(limit)
+
+        pair = tuple(pair.split('/'))
+        MarketPairsDB.check_valid_pair(pair)
+
+        swap_ids = []
+        for swap_id in AccountPairPendingSwapDB(self.msg.sender, pair, self.db):
+            swap_ids.append(swap_id)
+            if len(swap_ids) == limit:
+                break
+
+        self._cancel_maker_swaps(self.msg.sender, swap_ids)
+
+    @catch_error
+    @check_maintenance
+    @unit_of_work
     @external
     @payable
     def fill_icx_order(self, swap_id: int) -> None:
@@ -653,6 +971,7 @@ class ICONSwap(IconScoreBase):
         self._fill_swap(swap_id, ZERO_SCORE_ADDRESS, taker_amount, taker_address)
 
     @catch_error
+    @unit_of_work
     @external(readonly=True)
     def get_market_info(self, offset: int) -> dict:
 
@@ -669,35 +988,19 @@ class ICONSwap(IconScoreBase):
                     # Already in the cache
                     continue
 
-                if spot == str(ZERO_SCORE_ADDRESS):
-                    tokens[spot] = {
-                        "name": "ICX",
-                        "symbol": "ICX",
-                        "decimals": ICX_TOKEN_DECIMALS
-                    }
-                else:
-                    address = Address.from_string(spot)
-                    irc2 = self.create_interface_score(address, IRC2Interface)
-                    tokens[spot] = {
-                        "name": irc2.name(),
-                        "symbol": irc2.symbol(),
-                        "decimals": irc2.decimals()
-                    }
+                tokens[spot] = self._get_token(Address.from_string(spot))
 
         # build the pairs info
         for pair in pairs:
-            pair_tuple = tuple(pair['name'].split('/'))
-            pair['swaps_pending_count'] = len(MarketPendingSwapDB(pair_tuple, self.db))
-            last_swap = self._get_market_last_filled_swap(pair_tuple)
-            if last_swap:
-                # most recent swap
-                orders = last_swap.get_orders()
-                if MarketPairsDB.is_buyer(pair_tuple, orders[0].contract()):
-                    pair['last_price'] = last_swap.get_inverted_price()
-                else:
-                    pair['last_price'] = last_swap.get_price()
-            else:
-                pair['last_price'] = float(0)
+            summary = MarketSummaryDB(tuple(pair['name'].split('/')), self.db).get()
+            pair['swaps_pending_count'] = summary['buyers_count'] + summary['sellers_count']
+            pair['last_price'] = self._get_market_last_price(summary['last_price'])
+            # The order book prices are in quote per base, so best_bid < best_ask
+            pair['best_bid'] = self._get_market_price(summary['best_bid'])
+            pair['best_ask'] = self._get_market_price(summary['best_ask'])
+            pair['trade_count'] = summary['trade_count']
+            pair['base_volume'] = summary['base_volume']
+            pair['quote_volume'] = summary['quote_volume']
 
         return {
             "pairs": pairs,
@@ -705,28 +1008,49 @@ class ICONSwap(IconScoreBase):
         }
 
     @catch_error
+    @unit_of_work
     @external(readonly=True)
     def get_market_buyers_pending_swaps(self, pair: str, offset: int) -> list:
         pair = tuple(pair.split('/'))
         MarketPairsDB.check_valid_pair(pair)
         pending_swaps = MarketPendingSwapDB(pair, self.db)
         return [
-            Swap(swap_id, self.db).serialize()
+            self._get_swap(swap_id).serialize()
             for swap_id in pending_swaps.buyers().select(offset)
         ]
 
     @catch_error
+    @unit_of_work
+    @external(readonly=True)
+    def get_market_buyers_pending_swaps_after(self, pair: str, cursor: str) -> dict:
+        pair = tuple(pair.split('/'))
+        MarketPairsDB.check_valid_pair(pair)
+        pending_swaps = MarketPendingSwapDB(pair, self.db)
+        return self._serialize_market_swaps_page(*pending_swaps.buyers().select_after(cursor))
+
+    @catch_error
+    @unit_of_work
     @external(readonly=True)
     def get_market_sellers_pending_swaps(self, pair: str, offset: int) -> list:
         pair = tuple(pair.split('/'))
         MarketPairsDB.check_valid_pair(pair)
         pending_swaps = MarketPendingSwapDB(pair, self.db)
         return [
-            Swap(swap_id, self.db).serialize()
+            self._get_swap(swap_id).serialize()
             for swap_id in pending_swaps.sellers().select(offset)
         ]
 
     @catch_error
+    @unit_of_work
+    @external(readonly=True)
+    def get_market_sellers_pending_swaps_after(self, pair: str, cursor: str) -> dict:
+        pair = tuple(pair.split('/'))
+        MarketPairsDB.check_valid_pair(pair)
+        pending_swaps = MarketPendingSwapDB(pair, self.db)
+        return self._serialize_market_swaps_page(*pending_swaps.sellers().select_after(cursor))
+
+    @catch_error
+    @unit_of_work
     @external(readonly=True)
     def get_market_last_filled_swap(self, pair: str) -> dict:
         pair = tuple(pair.split('/'))
@@ -735,67 +1059,151 @@ class ICONSwap(IconScoreBase):
         return last_swap.serialize() if last_swap else {}
 
     @catch_error
+    @unit_of_work
     @external(readonly=True)
     def get_market_filled_swaps(self, pair: str, offset: int) -> list:
         pair = tuple(pair.split('/'))
         MarketPairsDB.check_valid_pair(pair)
         filled_swaps = MarketFilledSwapDB(pair, self.db)
         return [
-            Swap(swap_id, self.db).serialize()
+            self._get_swap(swap_id).serialize()
             for swap_id in filled_swaps.select(offset)
         ]
 
     @catch_error
+    @unit_of_work
+    @external(readonly=True)
+    def get_market_filled_swaps_after(self, pair: str, cursor: int) -> dict:
+        pair = tuple(pair.split('/'))
+        MarketPairsDB.check_valid_pair(pair)
+        filled_swaps = MarketFilledSwapDB(pair, self.db)
+        return self._serialize_swaps_page(filled_swaps.select_after(cursor))
+
+    @catch_error
+    @unit_of_work
     @external(readonly=True)
     def get_account_pending_swaps(self, address: Address, offset: int) -> list:
         pending_swaps = AccountPendingSwapDB(address, self.db)
         return [
-            Swap(swap_id, self.db).serialize()
+            self._get_swap(swap_id).serialize()
             for swap_id in pending_swaps.select(offset)
         ]
 
     @catch_error
+    @unit_of_work
+    @external(readonly=True)
+    def get_account_pending_swaps_after(self, address: Address, cursor: int) -> dict:
+        pending_swaps = AccountPendingSwapDB(address, self.db)
+        return self._serialize_swaps_page(pending_swaps.select_after(cursor))
+
+    @catch_error
+    @unit_of_work
     @external(readonly=True)
     def get_account_filled_swaps(self, address: Address, offset: int) -> list:
         filled_swaps = AccountFilledSwapDB(address, self.db)
         return [
-            Swap(swap_id, self.db).serialize()
+            self._get_swap(swap_id).serialize()
             for swap_id in filled_swaps.select(offset)
         ]
 
     @catch_error
+    @unit_of_work
+    @external(readonly=True)
+    def get_account_filled_swaps_after(self, address: Address, cursor: int) -> dict:
+        filled_swaps = AccountFilledSwapDB(address, self.db)
+        return self._serialize_swaps_page(filled_swaps.select_after(cursor))
+
+    @catch_error
+    @unit_of_work
     @external(readonly=True)
     def get_account_pair_pending_swaps(self, address: Address, pair: str, offset: int) -> list:
         pair = tuple(pair.split('/'))
         MarketPairsDB.check_valid_pair(pair)
         pending_swaps = AccountPairPendingSwapDB(address, pair, self.db)
         return [
-            Swap(swap_id, self.db).serialize()
+            self._get_swap(swap_id).serialize()
             for swap_id in pending_swaps.select(offset)
         ]
 
     @catch_error
+    @unit_of_work
+    @external(readonly=True)
+    def get_account_pair_pending_swaps_after(self, address: Address, pair: str, cursor: int) -> dict:
+        pair = tuple(pair.split('/'))
+        MarketPairsDB.check_valid_pair(pair)
+        pending_swaps = AccountPairPendingSwapDB(address, pair, self.db)
+        return self._serialize_swaps_page(pending_swaps.select_after(cursor))
+
+    @catch_error
+    @unit_of_work
     @external(readonly=True)
     def get_account_pair_filled_swaps(self, address: Address, pair: str, offset: int) -> list:
         pair = tuple(pair.split('/'))
         MarketPairsDB.check_valid_pair(pair)
         filled_swaps = AccountPairFilledSwapDB(address, pair, self.db)
         return [
-            Swap(swap_id, self.db).serialize()
+            self._get_swap(swap_id).serialize()
             for swap_id in filled_swaps.select(offset)
         ]
 
     @catch_error
+    @unit_of_work
+    @external(readonly=True)
+    def get_account_pair_filled_swaps_after(self, address: Address, pair: str, cursor: int) -> dict:
+        pair = tuple(pair.split('/'))
+        MarketPairsDB.check_valid_pair(pair)
+        filled_swaps = AccountPairFilledSwapDB(address, pair, self.db)
+        return self._serialize_swaps_page(filled_swaps.select_after(cursor))
+
+    @catch_error
+    @unit_of_work
     @external(readonly=True)
     def get_swap(self, swap_id: int) -> dict:
-        SystemSwapDB(self.db).check_exists(swap_id)
-        return Swap(swap_id, self.db).serialize()
+        swap = self._get_swap(swap_id)
+        swap.check_exists()
+        return swap.serialize()
 
     @catch_error
     @external(readonly=True)
     def get_order(self, order_id: int) -> dict:
-        SystemOrderDB(self.db).check_exists(order_id)
-        return Order(order_id, self.db).serialize()
+        order = Order(order_id, self.db)
+        order.check_exists()
+        return order.serialize()
+
+    @catch_error
+    @external(readonly=True)
+    def get_trade(self, trade_id: int) -> dict:
+        trade = Trade(trade_id, self.db)
+        trade.check_exists()
+        return trade.serialize()
+
+    @catch_error
+    @unit_of_work
+    @external(readonly=True)
+    def get_swap_trades(self, swap_id: int, offset: int) -> list:
+        self._get_swap(swap_id).check_exists()
+        return [
+            Trade(trade_id, self.db).serialize()
+            for trade_id in SwapTradeDB(swap_id, self.db).select(offset)
+        ]
+
+    @catch_error
+    @external(readonly=True)
+    def get_account_trades(self, address: Address, offset: int) -> list:
+        return [
+            Trade(trade_id, self.db).serialize()
+            for trade_id in AccountTradeDB(address, self.db).select(offset)
+        ]
+
+    @catch_error
+    @external(readonly=True)
+    def get_account_pair_trades(self, address: Address, pair: str, offset: int) -> list:
+        pair = tuple(pair.split('/'))
+        MarketPairsDB.check_valid_pair(pair)
+        return [
+            Trade(trade_id, self.db).serialize()
+            for trade_id in AccountPairTradeDB(address, pair, self.db).select(offset)
+        ]
 
     @catch_error
     @external(readonly=True)
@@ -803,11 +1211,31 @@ class ICONSwap(IconScoreBase):
         whitelist = Whitelist(self.db).select(offset)
         return [contract for contract in whitelist]
 
+    @catch_error
+    @external(readonly=True)
+    def get_packed_records_migration(self) -> dict:
+        return {
+            'cursor': self._packed_swap_id_cursor.get(),
+            'end': self._legacy_swap_id_max.get()
+        }
+
+    @catch_error
+    @external(readonly=True)
+    def get_market_book_migration(self, pair: str) -> int:
+        pair = tuple(pair.split('/'))
+        MarketPairsDB.check_valid_pair(pair)
+        return MarketPendingSwapDB(pair, self.db).legacy_steps()
+
     @catch_error
     @external(readonly=True)
     def maintenance_enabled(self) -> bool:
         return SCOREMaintenance(self.db).is_enabled()
 
+    @catch_error
+    @external(readonly=True)
+    def get_match_traces(self) -> list:
+        return MatchTrace(self.db).select()
+
     @catch_error
     @external(readonly=True)
     def version(self) -> str:
@@ -825,20 +1253,30 @@ class ICONSwap(IconScoreBase):
     @only_owner
     def add_whitelist(self, contract: Address) -> None:
         Whitelist(self.db).add(contract)
+        self._register_token(contract)
 
     @catch_error
     @external
     @only_owner
     def remove_whitelist(self, contract: Address) -> None:
+        # The token stays registered, as its pending swaps may still be filled
         Whitelist(self.db).remove(contract)
 
     @catch_error
     @external
     @only_owner
+    def refresh_token(self, contract: Address) -> None:
+        """ Request the token information to its contract again """
+        self._register_token(contract)
+
+    @catch_error
+    @unit_of_work
+    @external
+    @only_owner
     def cancel_swap_admin(self, swap_id: int) -> None:
         # Check if swap exists
-        SystemSwapDB(self.db).check_exists(swap_id)
-        swap = Swap(swap_id, self.db)
+        swap = self._get_swap(swap_id)
+        swap.check_exists()
         self._cancel_swap(swap)
 
     @catch_error
@@ -850,8 +1288,71 @@ class ICONSwap(IconScoreBase):
         elif mode == SCOREMaintenanceMode.DISABLED:
             SCOREMaintenance(self.db).disable()
 
+    @catch_error
+    @external
+    @only_owner
+    def set_match_trace_level(self, level: int) -> None:
+        MatchTrace(self.db).set_level(level)
+
     @catch_error
     @external
     @only_owner
     def set_iconbet_wages(self, address: Address) -> None:
         self._iconbet_wages.set(address)
+
+    @catch_error
+    @unit_of_work
+    @external
+    @only_owner
+    def migrate_packed_records(self, limit: int) -> None:
+        """ Convert up to `limit` swaps created before v0.5.0 and their orders to packed records """
+        cursor = self._packed_swap_id_cursor.get()
+        end = min(cursor + limit, self._legacy_swap_id_max.get())
+
+        for swap_id in range(cursor + 1, end + 1):
+            swap = self._get_swap(swap_id)
+            if swap.exists():
+                swap.pack()
+
+        self._packed_swap_id_cursor.set(end)
+
+    @catch_error
+    @external
+    @only_owner
+    def migrate_market_book(self, pair: str, limit: int) -> None:
+        """ Move up to `limit` swaps of an order book created before v0.5.0 to the price levels """
+        pair = tuple(pair.split('/'))
+        MarketPairsDB.check_valid_pair(pair)
+        MarketPendingSwapDB(pair, self.db).migrate_legacy_sides(limit)
+
+    @catch_error
+    @external
+    @only_owner
+    def delete_system_sets(self, limit: int) -> None:
+        """ Delete up to `limit` items of the swap and order registries used before v0.5.0 """
+        for system_set in (SystemSwapDB(self.db), SystemOrderDB(self.db)):
+            for _ in range(min(limit, len(system_set))):
+                system_set.pop()
+
+    # The filled swaps lists created before v0.5.0 are indexed in chunks by the operator
+    @catch_error
+    @external
+    @only_owner
+    def build_market_filled_swaps_index(self, pair: str, limit: int) -> None:
+        pair = tuple(pair.split('/'))
+        MarketPairsDB.check_valid_pair(pair)
+        MarketFilledSwapDB(pair, self.db).build_index(limit)
+
+    @catch_error
+    @external
+    @only_owner
+    def build_account_filled_swaps_index(self, address: Address, limit: int) -> None:
+        AccountFilledSwapDB(address, self.db).build_index(limit)
+
+    @catch_error
+    @external
+    @only_owner
+    def build_account_pair_filled_swaps_index(self, address: Address, pair: str, limit: int) -> None:
+        pair = tuple(pair.split('/'))
+        MarketPairsDB.check_valid_pair(pair)
+        AccountPairFilledSwapDB(address, pair, self.db).build_index(limit)
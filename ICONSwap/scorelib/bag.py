@@ -27,6 +27,12 @@ class BagDB(object):
     """
     BagDB is an iterable collection of items that may have duplicates.
     Order of retrieval is *optionally* significant (*not* significant by default)
+    The number of occurrences of each item is stored in a DictDB, so count and
+    membership don't need to iterate over the bag.
+    Items added before v0.5.0 aren't counted until they're indexed, see build_counts.
+    Removing an item from an ordered bag doesn't shift the following items :
+    its slot is marked as removed, and the removed slots are reclaimed later
+    in bounded steps, see compact.
     """
 
     _NAME = '_BAGDB'
@@ -34,18 +40,98 @@ class BagDB(object):
     def __init__(self, var_key: str, db: IconScoreDatabase, value_type: type, order=False):
         self._name = var_key + BagDB._NAME
         self._items = ArrayDB(f'{self._name}_items', db, value_type=value_type)
+        # Number of occurrences of each item
+        self._counts = DictDB(f'{self._name}_counts', db, value_type=int)
+        # All the items before this position are counted
+        self._counted = VarDB(f'{self._name}_counted', db, value_type=int)
+        # Slots of an ordered bag that have been removed
+        self._removed = DictDB(f'{self._name}_removed', db, value_type=bool)
+        self._removed_count = VarDB(f'{self._name}_removed_count', db, value_type=int)
+        # Compaction progress : the slots between the write and the read cursors are removed
+        self._compact_read = VarDB(f'{self._name}_compact_read', db, value_type=int)
+        self._compact_write = VarDB(f'{self._name}_compact_write', db, value_type=int)
         self._order = order
         self._db = db
 
+    def _slots(self, start: int = 0, end: int = None):
+        """ Iterates over the (index, item) of the slots that haven't been removed """
+        if end is None:
+            end = len(self._items)
+        has_removed = self._removed_count.get() > 0
+        for index in range(start, end):
+            if has_removed and self._removed[index]:
+                continue
+            yield index, self._items[index]
+
+    def _is_removed(self, index: int) -> bool:
+        return self._removed_count.get() > 0 and self._removed[index]
+
+    def _count_slot(self, index: int, item, delta: int) -> None:
+        """ Update the count of the item of a slot, if this slot is counted """
+        if index < self._counted.get():
+            self._count_item(item, delta)
+
+    def _truncate_counted(self, length: int) -> None:
+        if self._counted.get() > length:
+            self._counted.set(length)
+
+    def _uncounted(self, item) -> int:
+        """ Returns the number of occurrences of an item in the slots that aren't counted yet """
+        return sum(1 for index, cur in self._slots(self._counted.get()) if cur == item)
+
+    def _count_item(self, item, delta: int) -> None:
+        count = self._counts[item] + delta
+        if count > 0:
+            self._counts[item] = count
+        else:
+            del self._counts[item]
+
+    def _set_slot(self, index: int, item) -> None:
+        self._items[index] = item
+
+    def _remove_slot(self, index: int) -> None:
+        if self._order:
+            # Keep the order : only mark the slot as removed
+            self._removed[index] = True
+            self._removed_count.set(self._removed_count.get() + 1)
+        else:
+            # Replace the item with the tail of the array
+            last = self._items.pop()
+            length = len(self._items)
+            if index != length:
+                self._set_slot(index, last)
+                if length >= self._counted.get() > index:
+                    # The tail moves to a counted slot
+                    self._count_item(last, 1)
+            self._truncate_counted(length)
+
+    def _pop_slot(self) -> tuple:
+        """ Removes the last slot of the ArrayDB.
+            Returns its item, and whether the slot had been removed """
+        index = len(self._items) - 1
+        item = self._items.pop()
+        removed = self._is_removed(index)
+        if removed:
+            del self._removed[index]
+            self._removed_count.set(self._removed_count.get() - 1)
+        else:
+            self._count_slot(index, item, -1)
+        self._truncate_counted(index)
+        # Keep the compaction cursors inside the array
+        if self._compact_read.get() > index:
+            self._compact_read.set(index)
+            self._compact_write.set(min(self._compact_write.get(), index))
+        return item, removed
+
     def __iter__(self):
-        for item in self._items:
+        for index, item in self._slots():
             yield item
 
     def __len__(self) -> int:
-        return len(self._items)
+        return len(self._items) - self._removed_count.get()
 
     def __contains__(self, item) -> bool:
-        return item in self._items
+        return self._counts[item] > 0 or self._uncounted(item) > 0
 
     def check_exists(self, item) -> None:
         if not item in self:
@@ -53,78 +139,108 @@ class BagDB(object):
 
     def count(self, item) -> int:
         """ Returns the number of occurences of a given item in the bag """
-        count = 0
-        for cur in self._items:
-            if cur == item:
-                count += 1
-        return count
+        return self._counts[item] + self._uncounted(item)
+
+    def build_counts(self, limit: int) -> int:
+        """ Count up to `limit` slots added before v0.5.0.
+            Returns the number of slots that still need to be counted """
+        start = self._counted.get()
+        end = min(start + limit, len(self._items))
+
+        for index, item in self._slots(start, end):
+            self._count_item(item, 1)
+
+        self._counted.set(end)
+        return len(self._items) - end
 
     def add(self, item) -> None:
         """ Adds an item in the bag """
+        length = len(self._items)
         self._items.put(item)
+        if self._counted.get() == length:
+            self._count_item(item, 1)
+            self._counted.set(length + 1)
 
     def clear(self) -> None:
         """ Removes all the items from the bag """
         while self._items:
-            self._items.pop()
+            self._pop_slot()
 
     def remove(self, item) -> None:
         """ This operation removes a given item from the bag.
             If the item does not exist, it *does not raise* a KeyError.
         """
-        if self._order:
-            # Remove from the ArrayDB (ordered)
-            tmp = []
-            while self._items:
-                cur = self._items.pop()
-                # Keep all the elements until we reach the selected one
-                if cur != element:
-                    tmp.append(cur)
-                # We found the removable element, stop here
-                else:
-                    break
-            # Append the elements next to the removed one in order
-            while tmp:
-                cur = tmp.pop()
-                self._items.put(cur)
-        else:
-            # Remove from the ArrayDB (unordered)
-            length = len(self._items)
-            for idx, cur in enumerate(self._items):
-                # Look for the item index to be removed
-                if cur == item:
-                    if idx == length - 1:
-                        # Nothing left in the array
-                        self._items.pop()
-                    else:
-                        # Replace the old value with the tail of the array
-                        self._items[idx] = self._items.pop()
-                    return
+        if item not in self:
+            return
+
+        # Remove the first occurrence
+        for index, cur in self._slots():
+            if cur == item:
+                self._count_slot(index, item, -1)
+                self._remove_slot(index)
+                return
+
+    def remove_at(self, index: int) -> None:
+        """ Removes the item stored in a given slot of the bag.
+            If the slot is empty, it raises a ItemNotFound.
+        """
+        if not 0 <= index < len(self._items) or self._is_removed(index):
+            raise ItemNotFound(self._name, str(index))
+        self._count_slot(index, self._items[index], -1)
+        self._remove_slot(index)
+
+    def compact(self, limit: int) -> int:
+        """ Reclaims the removed slots of an ordered bag, reading up to `limit` slots.
+            Returns the number of removed slots left """
+        if self._removed_count.get() == 0:
+            self._compact_read.set(0)
+            self._compact_write.set(0)
+            return 0
+
+        read = self._compact_read.get()
+        write = self._compact_write.get()
+        end = min(read + limit, len(self._items))
+
+        for index in range(read, end):
+            if not self._removed[index]:
+                if index != write:
+                    # Slide the item over the first removed slot, its old slot is now removed
+                    item = self._items[index]
+                    self._set_slot(write, item)
+                    del self._removed[write]
+                    self._removed[index] = True
+                    if index >= self._counted.get() > write:
+                        # The item moves to a counted slot
+                        self._count_item(item, 1)
+                write += 1
+
+        if end == len(self._items):
+            # Only removed slots are left after the write cursor
+            while len(self._items) > write:
+                self._pop_slot()
+            end = write = 0
+
+        self._compact_read.set(end)
+        self._compact_write.set(write)
+        return self._removed_count.get()
 
     def select(self, offset: int, cond=None, **kwargs) -> list:
         """ Returns a limited amount of items in the BagDB that optionally fulfills a condition """
-        items = iter(self._items)
+        length = len(self._items)
         result = []
 
-        # Skip N items until offset
-        try:
-            for _ in range(offset):
-                next(items)
-        except StopIteration:
+        if offset > length:
             # Offset is bigger than the size of the bag
             raise StopIteration(self._name)
 
+        # Items are directly accessed by index, the skipped items aren't read.
+        # The offset counts the removed slots of an ordered bag, until they're compacted.
         # Do a maximum iteration count of MAX_ITERATION_LOOP
-        for _ in range(MAX_ITERATION_LOOP):
-            try:
-                item = next(items)
-                if cond:
-                    if cond(self._db, item, **kwargs):
-                        result.append(item)
-                else:
+        for index, item in self._slots(offset, min(offset + MAX_ITERATION_LOOP, length)):
+            if cond:
+                if cond(self._db, item, **kwargs):
                     result.append(item)
-            except StopIteration:
-                # End of array : stop here
-                break
+            else:
+                result.append(item)
 
         return result
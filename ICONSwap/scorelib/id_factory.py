@@ -30,5 +30,20 @@ class IdFactory:
     def get_uid(self) -> int:
         # UID = 0 is forbidden in order to prevent conflict with uninitialized uid
         # Starts with UID 1
-        self._uid.set(self._uid.get() + 1)
+        uid = self._uid.get() + 1
+        self._uid.set(uid)
+        return uid
+
+    def get_uids(self, count: int) -> range:
+        """ Reserve `count` consecutive UIDs at once """
+        first = self._uid.get() + 1
+        self._uid.set(first + count - 1)
+        return range(first, first + count)
+
+    def get_last_uid(self) -> int:
+        """ Returns the last UID generated, 0 if none """
         return self._uid.get()
+
+    def is_issued(self, uid: int) -> bool:
+        """ Returns True if the UID has already been generated """
+        return 0 < uid <= self._uid.get()
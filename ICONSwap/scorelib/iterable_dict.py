@@ -24,6 +24,8 @@ class IterableDictDB(object):
     Utility class wrapping the state DB.
     IterableDictDB behaves like a DictDB, but supports iterator operation at a higher step cost.
     Order of retrieval during iteration is *optionally* significant (*not* significant by default)
+    The keys are stored in a SetDB, so a key is added or deleted in O(1).
+    Large dicts can be cleared in several transactions, see clear.
     """
 
     _NAME = '_ITERABLE_DICTDB'
@@ -63,39 +65,58 @@ class IterableDictDB(object):
         del self._values[key]
         self._keys.remove(key)
 
+    def _select(self, keys, cond, **kwargs) -> dict:
+        result = {}
+
+        for key in keys:
+            item = (key, self._values[key])
+            if cond:
+                if cond(self._db, item, **kwargs):
+                    result[key] = item[1]
+            else:
+                result[key] = item[1]
+
+        return result
+
     def select(self, offset: int, cond=None, **kwargs) -> dict:
-        """ Returns a limited amount of items in the IterableDictDB that optionally fulfills a condition """
-        keys = iter(self._keys)
-        result = []
-
-        # Skip N items until offset
-        try:
-            for _ in range(offset):
-                next(keys)
-        except StopIteration:
-            # Offset is bigger than the size of the bag
-            raise StopIteration(self._name)
+        """ Returns a limited amount of items in the IterableDictDB that optionally fulfills a condition.
+            Kept for compatibility : the offset isn't stable if keys are deleted meanwhile, see select_after.
+        """
+        # Keys are directly accessed by their index in the SetDB, the skipped keys aren't read.
+        # Raises StopIteration if the offset is bigger than the size of the dict
+        return self._select(self._keys.select(offset), cond, **kwargs)
+
+    def select_after(self, key=None, cond=None, **kwargs) -> tuple:
+        """ Returns a limited amount of items following a given key (None for the first key)
+            that optionally fulfills a condition, along with the key to resume from
+            (None if it is the last page).
+            The key position is read from the keys SetDB, so the cost doesn't depend on it.
+            In an ordered dict, the pages are stable while keys are deleted. In an unordered
+            dict, a deleted key is replaced by the last key, that the following pages miss.
+            If the given key has been deleted, it raises a ItemNotFound.
+        """
+        keys = []
 
         # Do a maximum iteration count of MAX_ITERATION_LOOP
-        for _ in range(MAX_ITERATION_LOOP):
-            try:
-                key = next(keys)
-                item = (key, self._values[key])
-                if cond:
-                    if cond(self._db, item, **kwargs):
-                        result.append(item)
-                else:
-                    result.append(item)
-            except StopIteration:
-                # End of array : stop here
-                break
-
-        return {k: v for k, v in result}
-
-    def clear(self):
-        """ Remove all key,value pairs in the dict """
-        # Removes values
-        for key in self.keys():
-            del self._values[key]
-        # Remove keys
-        self._keys.clear()
+        for key in self._keys.iterate_after(key):
+            keys.append(key)
+            if len(keys) == MAX_ITERATION_LOOP:
+                return (self._select(keys, cond, **kwargs), key)
+
+        return (self._select(keys, cond, **kwargs), None)
+
+    def clear(self, limit: int = None) -> int:
+        """ Remove up to `limit` key,value pairs in the dict (all of them by default).
+            Returns the number of pairs left """
+        count = len(self._keys)
+        if limit is not None:
+            count = min(count, limit)
+
+        for _ in range(count):
+            del self._values[self._keys.pop()]
+
+        if len(self._keys) == 0:
+            # Remove the slots left by the deleted keys
+            self._keys.clear()
+
+        return len(self._keys)
@@ -16,6 +16,7 @@
 
 from iconservice import *
 from .id_factory import *
+from .packed import *
 from .consts import *
 
 
@@ -38,44 +39,328 @@ class LinkedNodeCannotMoveItself(Exception):
 class _NodeDB:
     """ NodeDB is an item of the LinkedListDB
         Its structure is internal and shouldn't be manipulated outside of this module
+        The value and the links of a node are packed into a single record, so a node
+        is read with a single storage access. Nodes created before v0.5.0 are stored
+        in separate fields, they're packed the first time they're modified.
+        Modifications are kept in memory until the node is flushed.
     """
     _NAME = '_NODEDB'
 
     def __init__(self, var_key: str, db: IconScoreDatabase, value_type: type):
         self._name = var_key + _NodeDB._NAME
+        self._record = VarDB(f'{self._name}_record', db, bytes)
+        # Legacy fields
         self._init = VarDB(f'{self._name}_init', db, int)
         self._value = VarDB(f'{self._name}_value', db, value_type)
         self._next = VarDB(f'{self._name}_next', db, int)
         self._prev = VarDB(f'{self._name}_prev', db, int)
+        self._types = (value_type, int, int)
+        # Fields are lazily loaded
+        self._fields = None
+        self._packed = False
+        self._dirty = False
         self._db = db
 
+    def _load(self) -> dict:
+        if self._fields is None:
+            record = self._record.get()
+            if record:
+                value, prev_id, next_id = PackedRecord.unpack(record, self._types)
+                self._fields = {'init': 1, 'value': value, 'prev': prev_id, 'next': next_id}
+                self._packed = True
+            else:
+                self._fields = {}
+        return self._fields
+
+    def _get(self, field: str):
+        fields = self._load()
+        if field not in fields:
+            # Only the fields of a legacy node may be missing
+            fields[field] = getattr(self, f'_{field}').get()
+        return fields[field]
+
+    def _update(self, **fields) -> None:
+        if not self._packed:
+            if self.exists():
+                # Move the legacy fields to the packed record
+                for field in ('value', 'prev', 'next'):
+                    self._get(field)
+                for legacy in (self._init, self._value, self._prev, self._next):
+                    legacy.remove()
+            else:
+                self._fields = {'init': 1, 'value': None, 'prev': 0, 'next': 0}
+            self._packed = True
+
+        self._fields.update(fields)
+        self._dirty = True
+
+    def flush(self) -> None:
+        if self._dirty:
+            values = (self._fields['value'], self._fields['prev'], self._fields['next'])
+            self._record.set(PackedRecord.pack(values, self._types))
+            self._dirty = False
+
     def delete(self) -> None:
-        self._value.remove()
-        self._prev.remove()
-        self._next.remove()
-        self._init.remove()
+        if self._packed:
+            self._record.remove()
+        else:
+            for legacy in (self._init, self._value, self._prev, self._next):
+                legacy.remove()
+        self._fields = {'init': 0}
+        self._packed = False
+        self._dirty = False
 
     def exists(self) -> bool:
-        return self._init.get() == 1
+        return self._get('init') == 1
 
     def get_value(self):
-        return self._value.get()
+        return self._get('value')
 
     def set_value(self, value) -> None:
-        self._init.set(1)
-        self._value.set(value)
+        self._update(value=value)
 
     def get_next(self) -> int:
-        return self._next.get()
+        return self._get('next')
 
     def set_next(self, next_id: int) -> None:
-        self._next.set(next_id)
+        self._update(next=next_id)
 
     def get_prev(self) -> int:
-        return self._prev.get()
+        return self._get('prev')
 
     def set_prev(self, prev_id: int) -> None:
-        self._prev.set(prev_id)
+        self._update(prev=prev_id)
+
+
+class _IndexNodeDB:
+    """ _IndexNodeDB holds the links of a node on each level of a _LinkedListIndex,
+        along with the number of positions skipped by each link.
+        Its structure is internal and shouldn't be manipulated outside of this module
+        Modifications are kept in memory until the node is flushed.
+    """
+    _NAME = '_INDEX_NODEDB'
+    _TYPES = (bytes, bytes, bytes)
+
+    def __init__(self, var_key: str, db: IconScoreDatabase):
+        self._name = var_key + _IndexNodeDB._NAME
+        self._record = VarDB(f'{self._name}_record', db, bytes)
+        # Fields are lazily loaded
+        self._fields = None
+        self._dirty = False
+        self._db = db
+
+    def _load(self) -> dict:
+        if self._fields is None:
+            record = self._record.get()
+            if record:
+                next_ids, prev_ids, widths = PackedRecord.unpack(record, _IndexNodeDB._TYPES)
+                self._fields = {'next': PackedRecord.unpack_list(next_ids, int),
+                                'prev': PackedRecord.unpack_list(prev_ids, int),
+                                'width': PackedRecord.unpack_list(widths, int)}
+            else:
+                self._fields = {}
+        return self._fields
+
+    def flush(self) -> None:
+        if self._dirty:
+            values = [PackedRecord.pack_list(self._fields[field], int) for field in ('next', 'prev', 'width')]
+            self._record.set(PackedRecord.pack(values, _IndexNodeDB._TYPES))
+            self._dirty = False
+
+    def create(self, height: int, width: int) -> None:
+        # The node is written once it is linked
+        self._fields = {'next': [0] * height, 'prev': [0] * height, 'width': [width] * height}
+
+    def delete(self) -> None:
+        self._record.remove()
+        self._fields = {}
+        self._dirty = False
+
+    def exists(self) -> bool:
+        return bool(self._load())
+
+    def get_height(self) -> int:
+        return len(self._load()['next'])
+
+    def get_next(self, level: int) -> int:
+        return self._load()['next'][level]
+
+    def set_next(self, level: int, next_id: int) -> None:
+        self._load()['next'][level] = next_id
+        self._dirty = True
+
+    def get_prev(self, level: int) -> int:
+        return self._load()['prev'][level]
+
+    def set_prev(self, level: int, prev_id: int) -> None:
+        self._load()['prev'][level] = prev_id
+        self._dirty = True
+
+    def get_width(self, level: int) -> int:
+        return self._load()['width'][level]
+
+    def set_width(self, level: int, width: int) -> None:
+        self._load()['width'][level] = width
+        self._dirty = True
+
+
+class _LinkedListIndex:
+    """ _LinkedListIndex is the optional position index of a LinkedListDB.
+        It is a skip list of the nodes of the LinkedListDB in the same order,
+        each link storing the number of positions it skips, so the node at a
+        given position is found in O(log n) instead of O(n).
+        Only a prefix of the LinkedListDB may be indexed, the nodes that existed
+        before the index was enabled are indexed in chunks, see LinkedListDB.build_index.
+        Its structure is internal and shouldn't be manipulated outside of this module
+    """
+    _NAME = '_INDEX'
+
+    # Maximum height of a node, enough for 4**16 items
+    _MAX_HEIGHT = 16
+
+    def __init__(self, var_key: str, db: IconScoreDatabase):
+        self._name = var_key + _LinkedListIndex._NAME
+        self._count = VarDB(f'{self._name}_count', db, int)
+        self._last_id = VarDB(f'{self._name}_last_id', db, int)
+        self._nodes = {}
+        self._db = db
+
+    def _node(self, node_id: int) -> _IndexNodeDB:
+        if node_id not in self._nodes:
+            node = _IndexNodeDB(str(node_id) + self._name, self._db)
+            # The node ID 0 stands for the head of the index, linked on all levels
+            if not node_id and not node.exists():
+                node.create(_LinkedListIndex._MAX_HEIGHT, 1)
+            self._nodes[node_id] = node
+        return self._nodes[node_id]
+
+    def _node_height(self, node_id: int) -> int:
+        # Each level contains statistically 1/4 of the nodes of the level below
+        digest = int.from_bytes(sha3_256(f'{self._name}_{node_id}'.encode('utf-8')), 'big')
+        height = 1
+        while height < _LinkedListIndex._MAX_HEIGHT and digest & 3 == 0:
+            height += 1
+            digest >>= 2
+        return height
+
+    def _predecessors(self, prev_id: int) -> tuple:
+        """ Returns for each level the last node linked on this level, up to a given node,
+            along with its distance to the position following this node """
+        predecessors = []
+        distances = []
+        cur_id = prev_id
+        distance = 1
+
+        for level in range(_LinkedListIndex._MAX_HEIGHT):
+            # Go backward on the level below until a node is linked on this level
+            while self._node(cur_id).get_height() <= level:
+                cur_id = self._node(cur_id).get_prev(level - 1)
+                distance += self._node(cur_id).get_width(level - 1)
+            predecessors.append(cur_id)
+            distances.append(distance)
+
+        return (predecessors, distances)
+
+    def flush(self) -> None:
+        for node in self._nodes.values():
+            node.flush()
+
+    def count(self) -> int:
+        """ Returns the number of indexed nodes """
+        return self._count.get()
+
+    def last_id(self) -> int:
+        """ Returns the ID of the last indexed node, 0 if none """
+        return self._last_id.get()
+
+    def is_indexed(self, node_id: int) -> bool:
+        return not node_id or self._node(node_id).exists()
+
+    def seek(self, position: int) -> int:
+        """ Returns the ID of the node at a given position, starting from 1.
+            The position needs to be lower or equal than the number of indexed nodes """
+        cur_id = 0
+        cur_position = 0
+
+        for level in reversed(range(_LinkedListIndex._MAX_HEIGHT)):
+            node = self._node(cur_id)
+            while node.get_next(level) and cur_position + node.get_width(level) <= position:
+                cur_position += node.get_width(level)
+                cur_id = node.get_next(level)
+                node = self._node(cur_id)
+
+        return cur_id
+
+    def insert(self, cur_id: int, prev_id: int) -> None:
+        """ Index a node inserted after a given node (0 for the head).
+            The node is only indexed if the previous node is indexed too. """
+        if not self.is_indexed(prev_id):
+            return
+
+        predecessors, distances = self._predecessors(prev_id)
+        cur = self._node(cur_id)
+        cur.create(self._node_height(cur_id), 0)
+
+        for level in range(_LinkedListIndex._MAX_HEIGHT):
+            pred_id = predecessors[level]
+            pred = self._node(pred_id)
+            if level < cur.get_height():
+                # Link the node between its predecessor and the next node
+                next_id = pred.get_next(level)
+                if next_id:
+                    self._node(next_id).set_prev(level, cur_id)
+                cur.set_next(level, next_id)
+                cur.set_prev(level, pred_id)
+                cur.set_width(level, pred.get_width(level) + 1 - distances[level])
+                pred.set_next(level, cur_id)
+                pred.set_width(level, distances[level])
+            else:
+                # The node is skipped by the link of the predecessor
+                pred.set_width(level, pred.get_width(level) + 1)
+
+        self._count.set(self._count.get() + 1)
+        if prev_id == self._last_id.get():
+            self._last_id.set(cur_id)
+
+    def remove(self, cur_id: int) -> None:
+        """ Remove a node from the index, if indexed """
+        if not self.is_indexed(cur_id):
+            return
+
+        cur = self._node(cur_id)
+        prev_id = cur.get_prev(0)
+        predecessors, _ = self._predecessors(prev_id)
+
+        for level in range(_LinkedListIndex._MAX_HEIGHT):
+            pred = self._node(predecessors[level])
+            if level < cur.get_height():
+                next_id = cur.get_next(level)
+                if next_id:
+                    self._node(next_id).set_prev(level, predecessors[level])
+                pred.set_next(level, next_id)
+                pred.set_width(level, pred.get_width(level) + cur.get_width(level) - 1)
+            else:
+                pred.set_width(level, pred.get_width(level) - 1)
+
+        cur.delete()
+        self._count.set(self._count.get() - 1)
+        if cur_id == self._last_id.get():
+            self._last_id.set(prev_id)
+
+    def clear(self) -> None:
+        """ Remove all the nodes from the index """
+        cur_id = self._node(0).get_next(0)
+
+        while cur_id:
+            node = self._node(cur_id)
+            next_id = node.get_next(0)
+            node.delete()
+            cur_id = next_id
+
+        self._node(0).delete()
+        self._nodes = {}
+        self._count.remove()
+        self._last_id.remove()
 
 
 class LinkedListDB:
@@ -83,16 +368,21 @@ class LinkedListDB:
         Order of retrieval is preserved.
         Circular linked listing or duplicates nodes in the same linkedlist is *not allowed*
         in order to prevent infinite loops.
+        If *indexed* (not indexed by default), the position of the nodes is indexed,
+        so select reaches a given offset in O(log n) instead of O(n).
     """
 
     _NAME = '_LINKED_LISTDB'
 
-    def __init__(self, var_key: str, db: IconScoreDatabase, value_type: type):
+    def __init__(self, var_key: str, db: IconScoreDatabase, value_type: type, indexed=False):
         self._name = var_key + LinkedListDB._NAME
         self._head_id = VarDB(f'{self._name}_head_id', db, int)
         self._tail_id = VarDB(f'{self._name}_tail_id', db, int)
         self._length = VarDB(f'{self._name}_length', db, int)
         self._value_type = value_type
+        self._index = _LinkedListIndex(self._name, db) if indexed else None
+        # Nodes accessed by this instance, so a node is only read once
+        self._nodes = {}
         self._db = db
 
     def delete(self) -> None:
@@ -105,25 +395,53 @@ class LinkedListDB:
         return self._length.get()
 
     def __iter__(self):
-        cur_id = self._head_id.get()
+        return self.iterate_after(0)
 
-        # Empty linked list
-        if not cur_id:
-            return iter(())
-
-        node = self._get_node(cur_id)
-        yield (cur_id, node.get_value())
+    def iterate_after(self, cur_id: int):
+        """ Iterate through the items following a given node id, or all the items if 0 """
         tail_id = self._tail_id.get()
 
+        if cur_id:
+            node = self._get_node(cur_id)
+            cur_id = node.get_next() if cur_id != tail_id else 0
+        else:
+            cur_id = self._head_id.get()
+
         # Iterate until tail
-        while cur_id != tail_id:
-            cur_id = node.get_next()
+        while cur_id:
             node = self._get_node(cur_id)
             yield (cur_id, node.get_value())
-            tail_id = self._tail_id.get()
+            if cur_id == tail_id:
+                break
+            cur_id = node.get_next()
 
     def _node(self, node_id) -> _NodeDB:
-        return _NodeDB(str(node_id) + self._name, self._db, self._value_type)
+        if node_id not in self._nodes:
+            self._nodes[node_id] = _NodeDB(str(node_id) + self._name, self._db, self._value_type)
+        return self._nodes[node_id]
+
+    def _flush(self) -> None:
+        # Write the nodes modified by the current operation
+        for node in self._nodes.values():
+            node.flush()
+        if self._index:
+            self._index.flush()
+
+    def _index_insert(self, cur_id: int, prev_id: int) -> None:
+        if self._index:
+            self._index.insert(cur_id, prev_id)
+
+    def _index_remove(self, cur_id: int) -> None:
+        if self._index:
+            self._index.remove(cur_id)
+
+    def _next_id(self, cur_id: int) -> int:
+        # The node ID 0 stands for the head of the list
+        if not cur_id:
+            return self._head_id.get()
+        if cur_id == self._tail_id.get():
+            return 0
+        return self._get_node(cur_id).get_next()
 
     def _create_node(self, value, node_id: int = None) -> _NodeDB:
         if node_id is None:
@@ -207,6 +525,9 @@ class LinkedListDB:
         # Delete the last node
         node.delete()
 
+        self._nodes = {}
+        if self._index:
+            self._index.clear()
         self._tail_id.remove()
         self._head_id.remove()
         self._length.set(0)
@@ -227,7 +548,9 @@ class LinkedListDB:
             # Update tail to cur node
             self._tail_id.set(cur_id)
 
+        self._index_insert(cur_id, cur.get_prev())
         self._length.set(self._length.get() + 1)
+        self._flush()
 
         return cur_id
 
@@ -247,7 +570,9 @@ class LinkedListDB:
             # Update head to cur node
             self._head_id.set(cur_id)
 
+        self._index_insert(cur_id, cur.get_prev())
         self._length.set(self._length.get() + 1)
+        self._flush()
 
         return cur_id
 
@@ -271,7 +596,9 @@ class LinkedListDB:
         # cur>pid
         cur.set_prev(after_id)
 
+        self._index_insert(cur_id, cur.get_prev())
         self._length.set(self._length.get() + 1)
+        self._flush()
         return cur_id
 
     def prepend_before(self, value, before_id: int, node_id: int = None) -> int:
@@ -294,7 +621,9 @@ class LinkedListDB:
         # cur>pid
         cur.set_prev(beforeprev_id)
 
+        self._index_insert(cur_id, cur.get_prev())
         self._length.set(self._length.get() + 1)
+        self._flush()
         return cur_id
 
     def move_node_after(self, cur_id: int, after_id: int) -> None:
@@ -341,6 +670,9 @@ class LinkedListDB:
         cur.set_next(afternext_id)
         # cur>pid
         cur.set_prev(after_id)
+        self._index_remove(cur_id)
+        self._index_insert(cur_id, cur.get_prev())
+        self._flush()
 
     def move_node_before(self, cur_id: int, before_id: int) -> None:
         """ Move an existing node before another existing node """
@@ -386,6 +718,9 @@ class LinkedListDB:
         cur.set_next(before_id)
         # cur>pid
         cur.set_prev(beforeprev_id)
+        self._index_remove(cur_id)
+        self._index_insert(cur_id, cur.get_prev())
+        self._flush()
 
     def move_node_tail(self, cur_id: int) -> None:
         """ Move an existing node at the tail of the linkedlist """
@@ -408,8 +743,13 @@ class LinkedListDB:
         tail.set_next(cur_id)
         # cur>pid
         cur.set_prev(tail_id)
+        # cur>nid
+        cur.set_next(0)
         # update tail
         self._tail_id.set(cur_id)
+        self._index_remove(cur_id)
+        self._index_insert(cur_id, cur.get_prev())
+        self._flush()
 
     def move_node_head(self, cur_id: int) -> None:
         """ Move an existing node at the head of the linkedlist """
@@ -432,32 +772,43 @@ class LinkedListDB:
         head.set_prev(cur_id)
         # cur>nid
         cur.set_next(head_id)
+        # cur>pid
+        cur.set_prev(0)
         # update head
         self._head_id.set(cur_id)
+        self._index_remove(cur_id)
+        self._index_insert(cur_id, cur.get_prev())
+        self._flush()
 
     def remove_head(self) -> None:
         """ Remove the current head from the linkedlist """
         if self._length.get() == 1:
             self.clear()
         else:
-            old_head = self._get_node(self._head_id.get())
+            old_head_id = self._head_id.get()
+            old_head = self._get_node(old_head_id)
             new_head = old_head.get_next()
+            self._index_remove(old_head_id)
             self._head_id.set(new_head)
             self._get_node(new_head).set_prev(0)
             old_head.delete()
             self._length.set(self._length.get() - 1)
+            self._flush()
 
     def remove_tail(self) -> None:
         """ Remove the current tail from the linkedlist """
         if self._length.get() == 1:
             self.clear()
         else:
-            old_tail = self._get_node(self._tail_id.get())
+            old_tail_id = self._tail_id.get()
+            old_tail = self._get_node(old_tail_id)
             new_tail = old_tail.get_prev()
+            self._index_remove(old_tail_id)
             self._tail_id.set(new_tail)
             self._get_node(new_tail).set_next(0)
             old_tail.delete()
             self._length.set(self._length.get() - 1)
+            self._flush()
 
     def remove(self, cur_id: int) -> None:
         """ Remove a given node from the linkedlist """
@@ -475,22 +826,51 @@ class LinkedListDB:
             curprev = self._get_node(curprev_id)
             curnext.set_prev(curprev_id)
             curprev.set_next(curnext_id)
+            self._index_remove(cur_id)
             cur.delete()
             self._length.set(self._length.get() - 1)
+            self._flush()
 
     def select(self, offset: int, cond=None, **kwargs) -> list:
         """ Returns a limited amount of items in the LinkedListDB that optionally fulfills a condition """
-        items = iter(self)
-        result = []
+        # Jump directly to the offset if it is indexed, or to the last indexed node
+        position = min(offset, self._index.count()) if self._index else 0
+        items = self.iterate_after(self._index.seek(position) if position else 0)
 
         # Skip N items until offset
         try:
-            for _ in range(offset):
+            for _ in range(offset - position):
                 next(items)
         except StopIteration:
             # Offset is bigger than the size of the bag
             raise StopIteration(self._name)
 
+        return self._select(items, cond, **kwargs)
+
+    def select_after(self, cur_id: int, cond=None, **kwargs) -> list:
+        """ Returns a limited amount of items following a given node id (0 for the head)
+            that optionally fulfills a condition. Unlike select, the cost doesn't depend
+            on the position of the items in the LinkedListDB """
+        return self._select(self.iterate_after(cur_id), cond, **kwargs)
+
+    def build_index(self, limit: int) -> int:
+        """ Index up to `limit` nodes created before the index was enabled.
+            Returns the number of nodes that still need to be indexed """
+        prev_id = self._index.last_id()
+        cur_id = self._next_id(prev_id)
+
+        for _ in range(limit):
+            if not cur_id:
+                break
+            self._index.insert(cur_id, prev_id)
+            prev_id, cur_id = cur_id, self._next_id(cur_id)
+
+        self._flush()
+        return len(self) - self._index.count()
+
+    def _select(self, items, cond=None, **kwargs) -> list:
+        result = []
+
         # Do a maximum iteration count of MAX_ITERATION_LOOP
         for _ in range(MAX_ITERATION_LOOP):
             try:
@@ -517,9 +897,9 @@ class UIDLinkedListDB(LinkedListDB):
     """
     _NAME = 'UID_LINKED_LIST_DB'
 
-    def __init__(self, address: Address, db: IconScoreDatabase):
+    def __init__(self, address: Address, db: IconScoreDatabase, indexed=False):
         name = f'{str(address)}_{UIDLinkedListDB._NAME}'
-        super().__init__(name, db, int)
+        super().__init__(name, db, int, indexed)
         self._name = name
 
     def append(self, uid: int, _: int = None) -> None:
@@ -534,6 +914,6 @@ class UIDLinkedListDB(LinkedListDB):
     def prepend_before(self, value: int, before_id: int, _: int = None) -> None:
         super().prepend_before(value, before_id, value)
 
-    def __iter__(self):
-        for node_id, uid in super().__iter__():
-            yield uid
+    def iterate_after(self, uid: int):
+        for node_id, cur_uid in super().iterate_after(uid):
+            yield cur_uid
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 ICONation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from iconservice import *
+
+
+class InvalidPackedRecord(Exception):
+    pass
+
+
+class PackedRecord:
+    """ PackedRecord encodes a list of fields into a single bytes value,
+        so a whole record can be read or written with a single storage access.
+        Each field is stored as its length (2 bytes) followed by its content.
+        Supported field types are int, str, bytes, bool and Address.
+    """
+
+    _LENGTH_SIZE = 2
+
+    @staticmethod
+    def _encode(value, value_type: type) -> bytes:
+        if value is None:
+            return b''
+        if value_type == int or value_type == bool:
+            value = int(value)
+            return value.to_bytes((value.bit_length() + 8) // 8, 'big', signed=True) if value else b''
+        if value_type == str:
+            return value.encode('utf-8')
+        if value_type == Address:
+            return value.to_bytes()
+        return value
+
+    @staticmethod
+    def _decode(content: bytes, value_type: type):
+        if value_type == int:
+            return int.from_bytes(content, 'big', signed=True)
+        if value_type == bool:
+            return int.from_bytes(content, 'big', signed=True) != 0
+        if value_type == str:
+            return content.decode('utf-8')
+        if not content:
+            return None
+        if value_type == Address:
+            return Address.from_bytes(content)
+        return content
+
+    @staticmethod
+    def pack(values: list, types: list) -> bytes:
+        """ Encode a list of values of the given types """
+        result = b''
+        for value, value_type in zip(values, types):
+            content = PackedRecord._encode(value, value_type)
+            result += len(content).to_bytes(PackedRecord._LENGTH_SIZE, 'big') + content
+        return result
+
+    @staticmethod
+    def unpack(record: bytes, types: list) -> list:
+        """ Decode a list of values of the given types """
+        values = []
+        offset = 0
+        for value_type in types:
+            length = int.from_bytes(record[offset:offset + PackedRecord._LENGTH_SIZE], 'big')
+            offset += PackedRecord._LENGTH_SIZE
+            values.append(PackedRecord._decode(record[offset:offset + length], value_type))
+            offset += length
+
+        if offset != len(record):
+            raise InvalidPackedRecord(len(record), offset)
+
+        return values
+
+    @staticmethod
+    def pack_list(values: list, value_type: type) -> bytes:
+        """ Encode a list of values of the same type """
+        return PackedRecord.pack(values, [value_type] * len(values))
+
+    @staticmethod
+    def unpack_list(record: bytes, value_type: type) -> list:
+        """ Decode a list of values of the same type, whatever their count """
+        values = []
+        offset = 0
+        while offset < len(record):
+            length = int.from_bytes(record[offset:offset + PackedRecord._LENGTH_SIZE], 'big')
+            offset += PackedRecord._LENGTH_SIZE
+            values.append(PackedRecord._decode(record[offset:offset + length], value_type))
+            offset += length
+
+        if offset != len(record):
+            raise InvalidPackedRecord(len(record), offset)
+
+        return values
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 ICONation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from iconservice import *
+
+
+class InvalidPrice(Exception):
+    pass
+
+
+class Price(object):
+    """ Price is the exact ratio between two integer amounts.
+        Prices are compared by cross-multiplication of their amounts,
+        so no float division or rounding is ever involved.
+    """
+
+    def __init__(self, numerator: int, denominator: int):
+        if numerator < 0 or denominator <= 0:
+            raise InvalidPrice(numerator, denominator)
+        self._numerator = numerator
+        self._denominator = denominator
+
+    @staticmethod
+    def from_key(key: str) -> 'Price':
+        """ Build a price from its string representation """
+        numerator, denominator = key.split('/')
+        return Price(int(numerator), int(denominator))
+
+    def key(self) -> str:
+        """ Returns the string representation of the price, suitable for storage """
+        return f'{self._numerator}/{self._denominator}'
+
+    def reduced(self) -> 'Price':
+        """ Returns the irreducible form of the price, so equal prices share the same key """
+        gcd, remainder = self._denominator, self._numerator
+        while remainder:
+            gcd, remainder = remainder, gcd % remainder
+        return Price(self._numerator // gcd, self._denominator // gcd)
+
+    def numerator(self) -> int:
+        return self._numerator
+
+    def denominator(self) -> int:
+        return self._denominator
+
+    def mul(self, amount: int) -> int:
+        """ Returns amount * price, rounded down """
+        return (amount * self._numerator) // self._denominator
+
+    def div(self, amount: int) -> int:
+        """ Returns amount / price, rounded down """
+        return (amount * self._denominator) // self._numerator
+
+    def _cross(self, other: 'Price') -> tuple:
+        return (self._numerator * other._denominator, other._numerator * self._denominator)
+
+    def __eq__(self, other: 'Price') -> bool:
+        left, right = self._cross(other)
+        return left == right
+
+    def __ne__(self, other: 'Price') -> bool:
+        left, right = self._cross(other)
+        return left != right
+
+    def __lt__(self, other: 'Price') -> bool:
+        left, right = self._cross(other)
+        return left < right
+
+    def __le__(self, other: 'Price') -> bool:
+        left, right = self._cross(other)
+        return left <= right
+
+    def __gt__(self, other: 'Price') -> bool:
+        left, right = self._cross(other)
+        return left > right
+
+    def __ge__(self, other: 'Price') -> bool:
+        left, right = self._cross(other)
+        return left >= right
+
+    def __float__(self) -> float:
+        # Only meant to be used for display purposes
+        return self._numerator / self._denominator
+
+    def __str__(self) -> str:
+        return self.key()
@@ -22,6 +22,10 @@ class SetDB(BagDB):
     """
     SetDB is an iterable collection of *unique* items.
     Order of retrieval is *optionally* significant (*not* significant by default)
+    The position of each item is stored in a DictDB, so membership, add and remove
+    are done in O(1).
+    Items added before v0.5.0 don't have a stored position until they're indexed,
+    see build_index.
     """
 
     _NAME = '_SETDB'
@@ -30,33 +34,119 @@ class SetDB(BagDB):
         name = var_key + SetDB._NAME
         super().__init__(name, db, value_type, order)
         self._name = name
+        # Position of the items in the ArrayDB, plus one (0 if not stored)
+        self._positions = DictDB(f'{self._name}_positions', db, value_type=int)
+        # All the items before this position have a stored position
+        self._indexed = VarDB(f'{self._name}_indexed', db, value_type=int)
         self._db = db
 
+    def _index_of(self, item) -> int:
+        """ Returns the position of an item in the ArrayDB, -1 if it doesn't exist """
+        index = self._positions[item] - 1
+        if index >= 0:
+            return index
+
+        # Look for the items without stored position
+        for index, cur in self._slots(self._indexed.get()):
+            if cur == item:
+                return index
+
+        return -1
+
+    def _count_item(self, item, delta: int) -> None:
+        # Items are unique, their stored position is enough to know if they're in the set
+        pass
+
+    def _set_slot(self, index: int, item) -> None:
+        super()._set_slot(index, item)
+        self._positions[item] = index + 1
+
+    def _remove_index(self, index: int) -> None:
+        del self._positions[self._items[index]]
+        self._remove_slot(index)
+        self._indexed.set(min(self._indexed.get(), len(self._items)))
+
+    def __contains__(self, item) -> bool:
+        return self._index_of(item) >= 0
+
+    def iterate_after(self, item):
+        """ Iterate through the items following a given item, or all the items if None.
+            If the given item doesn't exist, it raises a ItemNotFound.
+        """
+        start = 0
+        if item is not None:
+            index = self._index_of(item)
+            if index < 0:
+                raise ItemNotFound(self._name, str(item))
+            start = index + 1
+
+        for index, cur in self._slots(start):
+            yield cur
+
+    def count(self, item) -> int:
+        return 1 if item in self else 0
+
+    def build_index(self, limit: int) -> int:
+        """ Store the position of up to `limit` items added before v0.5.0.
+            Returns the number of items that still need to be indexed """
+        start = self._indexed.get()
+        end = min(start + limit, len(self._items))
+
+        for index, item in self._slots(start, end):
+            self._positions[item] = index + 1
+
+        self._indexed.set(end)
+        return len(self._items) - end
+
     def add(self, item) -> None:
         """ Adds an element to the set 
             If it already exists, it *does not raise* any exception
         """
-        if item not in self._items:
+        if self._index_of(item) < 0:
+            length = len(self._items)
             super().add(item)
+            self._positions[item] = length + 1
+            if self._indexed.get() == length:
+                self._indexed.set(length + 1)
 
     def remove(self, item) -> None:
         """ This operation removes element x from the set.
             If element x does not exist, it raises a ItemNotFound.
         """
-        if item not in self._items:
+        index = self._index_of(item)
+        if index < 0:
             raise ItemNotFound(self._name, str(item))
-        super().remove(item)
+        self._remove_index(index)
 
     def discard(self, item) -> None:
         """ This operation also removes element x from the set.
             If element x does not exist, it *does not raise* a ItemNotFound.
         """
-        if item in self._items:
-            super().remove(item)
+        index = self._index_of(item)
+        if index >= 0:
+            self._remove_index(index)
+
+    def clear(self) -> None:
+        """ Removes all the items from the set """
+        while self._items:
+            item, removed = self._pop_slot()
+            if not removed:
+                del self._positions[item]
+        self._indexed.set(0)
+
+    def compact(self, limit: int) -> int:
+        remaining = super().compact(limit)
+        self._indexed.set(min(self._indexed.get(), len(self._items)))
+        return remaining
 
     def pop(self):
         """ Removes an element from the set and returns it """
-        return self._items.pop()
+        removed = True
+        while removed:
+            item, removed = self._pop_slot()
+        del self._positions[item]
+        self._indexed.set(min(self._indexed.get(), len(self._items)))
+        return item
 
     def difference(self, other: set):
         """ Returns a set containing the difference between two or more sets """
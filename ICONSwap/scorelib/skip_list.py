@@ -0,0 +1,443 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 ICONation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from iconservice import *
+from .id_factory import *
+from .packed import *
+from .consts import *
+
+
+class EmptySkipListException(Exception):
+    pass
+
+
+class SkipNodeNotFound(Exception):
+    pass
+
+
+class SkipNodeAlreadyExists(Exception):
+    pass
+
+
+class _SkipNodeDB:
+    """ _SkipNodeDB is an item of the SkipListDB
+        Its structure is internal and shouldn't be manipulated outside of this module
+        The value, the key and the links of a node are packed into a single record,
+        so a node is read with a single storage access.
+        Modifications are kept in memory until the node is flushed.
+    """
+    _NAME = '_SKIP_NODEDB'
+
+    def __init__(self, var_key: str, db: IconScoreDatabase, value_type: type, key_type: type):
+        self._name = var_key + _SkipNodeDB._NAME
+        self._record = VarDB(f'{self._name}_record', db, bytes)
+        # The links of all levels are packed in their own fields
+        self._types = (value_type, key_type, bytes, bytes)
+        # Fields are lazily loaded
+        self._fields = None
+        self._dirty = False
+        self._db = db
+
+    def _load(self) -> dict:
+        if self._fields is None:
+            record = self._record.get()
+            if record:
+                value, key, next_ids, prev_ids = PackedRecord.unpack(record, self._types)
+                self._fields = {'value': value, 'key': key,
+                                'next': PackedRecord.unpack_list(next_ids, int),
+                                'prev': PackedRecord.unpack_list(prev_ids, int)}
+            else:
+                self._fields = {}
+        return self._fields
+
+    def flush(self) -> None:
+        if self._dirty:
+            fields = self._fields
+            values = (fields['value'], fields['key'],
+                      PackedRecord.pack_list(fields['next'], int), PackedRecord.pack_list(fields['prev'], int))
+            self._record.set(PackedRecord.pack(values, self._types))
+            self._dirty = False
+
+    def create(self, value, key, height: int) -> None:
+        self._fields = {'value': value, 'key': key, 'next': [0] * height, 'prev': [0] * height}
+        self._dirty = True
+
+    def delete(self) -> None:
+        self._record.remove()
+        self._fields = {}
+        self._dirty = False
+
+    def exists(self) -> bool:
+        return bool(self._load())
+
+    def get_value(self):
+        return self._load()['value']
+
+    def get_key(self):
+        return self._load()['key']
+
+    def set_key(self, key) -> None:
+        self._load()['key'] = key
+        self._dirty = True
+
+    def get_height(self) -> int:
+        return len(self._load()['next'])
+
+    def get_next(self, level: int) -> int:
+        return self._load()['next'][level]
+
+    def set_next(self, level: int, next_id: int) -> None:
+        self._load()['next'][level] = next_id
+        self._dirty = True
+
+    def get_prev(self, level: int) -> int:
+        return self._load()['prev'][level]
+
+    def set_prev(self, level: int, prev_id: int) -> None:
+        self._load()['prev'][level] = prev_id
+        self._dirty = True
+
+
+class SkipListDB:
+    """ SkipListDB is an iterable collection of items sorted by a key.
+        The key of each item is stored in its node, so finding a position only
+        reads one value per visited node.
+        All the nodes are double linked on the bottom level, which preserves the
+        retrieval order of a LinkedListDB. A fraction of them are also linked on
+        the upper levels, which allows to find the position of a new item, remove
+        an item or get the first item in O(log n) instead of O(n).
+        The height of a node is derived from the hash of its ID, so the structure
+        of the list doesn't depend on the insertion order.
+    """
+
+    _NAME = '_SKIP_LISTDB'
+
+    # Maximum height of a node, enough for 4**16 items
+    _MAX_HEIGHT = 16
+
+    def __init__(self, var_key: str, db: IconScoreDatabase, value_type: type, key_type: type = int):
+        self._name = var_key + SkipListDB._NAME
+        self._heads = DictDB(f'{self._name}_heads', db, int)
+        self._tails = DictDB(f'{self._name}_tails', db, int)
+        self._height = VarDB(f'{self._name}_height', db, int)
+        self._length = VarDB(f'{self._name}_length', db, int)
+        self._value_type = value_type
+        self._key_type = key_type
+        # Nodes accessed by this instance, so a node is only read once
+        self._nodes = {}
+        self._db = db
+
+    def delete(self) -> None:
+        self.clear()
+        self._height.remove()
+        self._length.remove()
+
+    def __len__(self) -> int:
+        return self._length.get()
+
+    def __iter__(self):
+        return self.iterate_after(0)
+
+    def iterate_after(self, cur_id: int):
+        """ Iterate through the (node id, value) following a given node id, or all of them if 0 """
+        cur_id = self._get_node(cur_id).get_next(0) if cur_id else self._heads[0]
+
+        # Iterate the bottom level until tail
+        while cur_id:
+            node = self._get_node(cur_id)
+            yield (cur_id, node.get_value())
+            cur_id = node.get_next(0)
+
+    def items(self):
+        """ Iterate through the (node id, value, key) of the skiplist """
+        return self._items_from(self._heads[0])
+
+    def items_after_key(self, key, compare):
+        """ Iterate through the (node id, value, key) of the nodes placed after a given key,
+            whether a node with this key exists or not. See add for the compare function.
+        """
+        prev_id = self._find_predecessors(key, compare)[0]
+        return self._items_from(self._next_id(prev_id, 0))
+
+    def _items_from(self, cur_id: int):
+        while cur_id:
+            node = self._get_node(cur_id)
+            yield (cur_id, node.get_value(), node.get_key())
+            cur_id = node.get_next(0)
+
+    def _node(self, node_id: int) -> _SkipNodeDB:
+        if node_id not in self._nodes:
+            self._nodes[node_id] = _SkipNodeDB(str(node_id) + self._name, self._db, self._value_type, self._key_type)
+        return self._nodes[node_id]
+
+    def _flush(self) -> None:
+        # Write the nodes modified by the current operation
+        for node in self._nodes.values():
+            node.flush()
+
+    def _node_height(self, node_id: int) -> int:
+        # Each level contains statistically 1/4 of the nodes of the level below
+        digest = int.from_bytes(sha3_256(f'{self._name}_{node_id}'.encode('utf-8')), 'big')
+        height = 1
+        while height < SkipListDB._MAX_HEIGHT and digest & 3 == 0:
+            height += 1
+            digest >>= 2
+        return height
+
+    def _create_node(self, value, key, node_id: int = None) -> tuple:
+        if node_id is None:
+            node_id = IdFactory(self._name + '_skip_nodedb', self._db).get_uid()
+
+        node = self._node(node_id)
+
+        # Check if node already exists
+        if node.exists():
+            raise SkipNodeAlreadyExists(self._name, node_id)
+
+        node.create(value, key, self._node_height(node_id))
+        return (node_id, node)
+
+    def _get_node(self, node_id: int) -> _SkipNodeDB:
+        node = self._node(node_id)
+        if not node.exists():
+            raise SkipNodeNotFound(self._name, node_id)
+        return node
+
+    def _next_id(self, cur_id: int, level: int) -> int:
+        # The node ID 0 stands for the head of the list
+        if not cur_id:
+            return self._heads[level]
+        return self._node(cur_id).get_next(level)
+
+    def _find_predecessors(self, key, compare) -> list:
+        """ Returns for each level the ID of the last node that
+            should stay before the given key (0 if none) """
+        predecessors = [0] * SkipListDB._MAX_HEIGHT
+        cur_id = 0
+
+        for level in reversed(range(self._height.get())):
+            next_id = self._next_id(cur_id, level)
+            while next_id:
+                if compare(key, self._node(next_id).get_key()):
+                    break
+                cur_id = next_id
+                next_id = self._next_id(cur_id, level)
+            predecessors[level] = cur_id
+
+        return predecessors
+
+    def _link(self, node_id: int, node: _SkipNodeDB, predecessors: list) -> None:
+        height = node.get_height()
+
+        for level in range(height):
+            prev_id = predecessors[level]
+            next_id = self._next_id(prev_id, level)
+
+            if prev_id:
+                self._node(prev_id).set_next(level, node_id)
+                node.set_prev(level, prev_id)
+            else:
+                self._heads[level] = node_id
+
+            if next_id:
+                self._node(next_id).set_prev(level, node_id)
+                node.set_next(level, next_id)
+            else:
+                self._tails[level] = node_id
+
+        if height > self._height.get():
+            self._height.set(height)
+
+        self._length.set(self._length.get() + 1)
+        self._flush()
+
+    def node_value(self, cur_id: int):
+        """ Returns the value of a given node id """
+        return self._get_node(cur_id).get_value()
+
+    def node_key(self, cur_id: int):
+        """ Returns the key of a given node id """
+        return self._get_node(cur_id).get_key()
+
+    def set_node_key(self, cur_id: int, key) -> None:
+        """ Update the key of a given node id.
+            The node isn't moved, so the caller needs to make sure
+            the order of the skiplist is preserved.
+        """
+        self._get_node(cur_id).set_key(key)
+        self._flush()
+
+    def head_id(self) -> int:
+        """ Returns the node id of the first item, 0 if empty """
+        return self._heads[0]
+
+    def head_value(self):
+        """ Returns the value of the head of the skiplist """
+        head_id = self._heads[0]
+        if not head_id:
+            raise EmptySkipListException(self._name)
+        return self.node_value(head_id)
+
+    def tail_value(self):
+        """ Returns the value of the tail of the skiplist """
+        tail_id = self._tails[0]
+        if not tail_id:
+            raise EmptySkipListException(self._name)
+        return self.node_value(tail_id)
+
+    def next(self, cur_id: int) -> int:
+        """ Get the next node id from a given node
+            Raises StopIteration if it doesn't exist """
+        next_id = self._get_node(cur_id).get_next(0)
+        if not next_id:
+            raise StopIteration(self._name)
+        return next_id
+
+    def prev(self, cur_id: int) -> int:
+        """ Get the previous node id from a given node
+            Raises StopIteration if it doesn't exist """
+        prev_id = self._get_node(cur_id).get_prev(0)
+        if not prev_id:
+            raise StopIteration(self._name)
+        return prev_id
+
+    def add(self, value, key, compare, node_id: int = None) -> int:
+        """ Insert an element in the skiplist according to its key.
+            compare(new_key, cur_key) must return True if the new key
+            needs to be placed before the current key. Items with equal keys
+            are kept in their insertion order.
+        """
+        predecessors = self._find_predecessors(key, compare)
+        cur_id, cur = self._create_node(value, key, node_id)
+        self._link(cur_id, cur, predecessors)
+        return cur_id
+
+    def append(self, value, key, node_id: int = None) -> int:
+        """ Append an element at the end of the skiplist.
+            The caller needs to make sure the order of the skiplist is preserved.
+        """
+        cur_id, cur = self._create_node(value, key, node_id)
+        predecessors = [self._tails[level] for level in range(cur.get_height())]
+        self._link(cur_id, cur, predecessors)
+        return cur_id
+
+    def remove(self, cur_id: int) -> None:
+        """ Remove a given node from the skiplist """
+        cur = self._get_node(cur_id)
+
+        for level in range(cur.get_height()):
+            prev_id = cur.get_prev(level)
+            next_id = cur.get_next(level)
+
+            if prev_id:
+                self._node(prev_id).set_next(level, next_id)
+            else:
+                self._heads[level] = next_id
+
+            if next_id:
+                self._node(next_id).set_prev(level, prev_id)
+            else:
+                self._tails[level] = prev_id
+
+        cur.delete()
+        self._length.set(self._length.get() - 1)
+        self._flush()
+
+        # Lower the height of the skiplist if the upper levels are now empty
+        height = self._height.get()
+        while height > 0 and not self._heads[height - 1]:
+            height -= 1
+        self._height.set(height)
+
+    def clear(self) -> None:
+        """ Delete all nodes from the skiplist """
+        cur_id = self._heads[0]
+
+        while cur_id:
+            node = self._get_node(cur_id)
+            next_id = node.get_next(0)
+            node.delete()
+            cur_id = next_id
+
+        self._nodes = {}
+        for level in range(self._height.get()):
+            self._heads.remove(level)
+            self._tails.remove(level)
+
+        self._height.set(0)
+        self._length.set(0)
+
+    def select(self, offset: int, cond=None, **kwargs) -> list:
+        """ Returns a limited amount of items in the SkipListDB that optionally fulfills a condition """
+        items = iter(self)
+        result = []
+
+        # Skip N items until offset
+        try:
+            for _ in range(offset):
+                next(items)
+        except StopIteration:
+            # Offset is bigger than the size of the skiplist
+            raise StopIteration(self._name)
+
+        # Do a maximum iteration count of MAX_ITERATION_LOOP
+        for _ in range(MAX_ITERATION_LOOP):
+            try:
+                node = next(items)
+                if cond:
+                    if cond(self._db, node, **kwargs):
+                        result.append(node)
+                else:
+                    result.append(node)
+            except StopIteration:
+                # End of skiplist : stop here
+                break
+
+        return result
+
+
+class UIDSkipListDB(SkipListDB):
+    """
+        UIDSkipListDB is a skip list of unique IDs.
+        The skiplist node ID is equal to the value of the UID provided,
+        so the developer needs to make sure the UID provided is globally unique to the application.
+    """
+    _NAME = 'UID_SKIP_LIST_DB'
+
+    def __init__(self, var_key: str, db: IconScoreDatabase, key_type: type = int):
+        name = f'{var_key}_{UIDSkipListDB._NAME}'
+        super().__init__(name, db, int, key_type)
+        self._name = name
+
+    def add(self, uid: int, key, compare, _: int = None) -> None:
+        super().add(uid, key, compare, uid)
+
+    def append(self, uid: int, key, _: int = None) -> None:
+        super().append(uid, key, uid)
+
+    def iterate_after(self, uid: int):
+        for node_id, cur_uid in super().iterate_after(uid):
+            yield cur_uid
+
+    def items(self):
+        """ Iterate through the (uid, key) of the skiplist """
+        for node_id, uid, key in super().items():
+            yield (uid, key)
+
+    def items_after_key(self, key, compare):
+        """ Iterate through the (uid, key) of the nodes placed after a given key """
+        for node_id, uid, cur_key in super().items_after_key(key, compare):
+            yield (uid, cur_key)
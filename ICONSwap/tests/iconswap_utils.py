@@ -4,7 +4,9 @@ from iconsdk.libs.in_memory_zip import gen_deploy_data_content
 from iconsdk.signed_transaction import SignedTransaction
 from ICONSwap.tests.utils import *
 import json
+import os
 
+DIR_PATH = os.path.abspath(os.path.dirname(__file__))
 ICX_CONTRACT = 'cx0000000000000000000000000000000000000000'
 
 
@@ -247,3 +249,45 @@ class ICONSwapTests(IconIntegrateTestBase):
             params={"offset": offset},
             icon_service=self.icon_service
         )
+
+
+class ICONSwapDeployedTests(ICONSwapTests):
+    """ Deploys the SCORE and two IRC2 tokens, and funds the test wallets """
+    TEST_HTTP_ENDPOINT_URI_V3 = "http://127.0.0.1:9000/api/v3"
+    SCORE_PROJECT = os.path.abspath(os.path.join(DIR_PATH, '..'))
+    IRC2_PROJECT = os.path.abspath(os.path.join(DIR_PATH, './irc2'))
+
+    def setUp(self):
+        super().setUp()
+
+        self.icon_service = None
+
+        # install SCORE
+        self._score_address = self._deploy_score(self.SCORE_PROJECT)['scoreAddress']
+        self._operator = self._test1
+        self._user = self._wallet_array[0]
+        self._attacker = self._wallet_array[1]
+
+        for wallet in self._wallet_array:
+            icx_transfer_call(
+                super(), self._test1, wallet.get_address(), 100 * 10**18, self.icon_service)
+
+        self._operator_icx_balance = get_icx_balance(super(), address=self._operator.get_address(), icon_service=self.icon_service)
+        self._user_icx_balance = get_icx_balance(super(), address=self._user.get_address(), icon_service=self.icon_service)
+        self._irc2_address = self._deploy_irc2(self.IRC2_PROJECT)['scoreAddress']
+        self._irc2_address_2 = self._deploy_irc2(self.IRC2_PROJECT)['scoreAddress']
+
+        irc2_transfer(super(), from_=self._operator, token=self._irc2_address, to_=self._user.get_address(), value=0x1000000, icon_service=self.icon_service)
+        irc2_transfer(super(), from_=self._operator, token=self._irc2_address_2, to_=self._user.get_address(), value=0x1000000, icon_service=self.icon_service)
+        self._operator_irc2_balance = get_irc2_balance(super(), address=self._operator.get_address(), token=self._irc2_address, icon_service=self.icon_service)
+        self._user_irc2_balance = get_irc2_balance(super(), address=self._user.get_address(), token=self._irc2_address, icon_service=self.icon_service)
+
+    def _call(self, method, params):
+        return icx_call(
+            super(),
+            from_=self._operator.get_address(),
+            to_=self._score_address,
+            method=method,
+            params=params,
+            icon_service=self.icon_service
+        )
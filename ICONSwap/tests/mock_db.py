@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 ICONation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+class MockIconScoreDatabase:
+    """ In-memory IconScoreDatabase, so the storage structures of the SCORE
+        can be tested directly, without deploying it on a node.
+        Sub databases share the storage of their parent, under their prefix.
+    """
+
+    def __init__(self, storage: dict = None, prefix: tuple = ()):
+        self._storage = {} if storage is None else storage
+        self._prefix = prefix
+
+    def _key(self, key) -> tuple:
+        return self._prefix + (key,)
+
+    def get(self, key):
+        return self._storage.get(self._key(key))
+
+    def put(self, key, value) -> None:
+        self._storage[self._key(key)] = value
+
+    def delete(self, key) -> None:
+        self._storage.pop(self._key(key), None)
+
+    def get_sub_db(self, prefix) -> 'MockIconScoreDatabase':
+        return MockIconScoreDatabase(self._storage, self._key(prefix))
+
+    def __len__(self) -> int:
+        """ Returns the number of values stored, including the ones of the sub databases """
+        return len(self._storage)
@@ -128,3 +128,28 @@ class TestICONSwap(ICONSwapTests):
             icon_service=self.icon_service
         )
         self.assertEqual(result['failure']['message'], f"SenderNotScoreOwnerError({self._operator.get_address()})")
+
+    def test_refresh_token_ok(self):
+        self._add_whitelist(self._irc2_address)
+
+        # OK
+        result = transaction_call_success(
+            super(),
+            from_=self._operator,
+            to_=self._score_address,
+            method="refresh_token",
+            params={'contract': self._irc2_address},
+            icon_service=self.icon_service
+        )
+
+    def test_refresh_token_not_operator(self):
+        # OK
+        result = transaction_call_error(
+            super(),
+            from_=self._attacker,
+            to_=self._score_address,
+            method="refresh_token",
+            params={'contract': self._irc2_address},
+            icon_service=self.icon_service
+        )
+        self.assertEqual(result['failure']['message'], f"SenderNotScoreOwnerError({self._operator.get_address()})")
@@ -188,6 +188,76 @@ class TestICONSwap(ICONSwapTests):
         self.assertEqual(operator_balance, self._operator_irc2_balance)
         self.assertEqual(user_balance, self._user_irc2_balance)
 
+    def test_cancel_swaps_ok(self):
+        swap_ids = [self._create_icx_irc2_swap(100, 200)[0], self._create_icx_irc2_swap(50, 200)[0]]
+
+        # OK
+        result = transaction_call_success(
+            super(),
+            from_=self._operator,
+            to_=self._score_address,
+            method="cancel_swaps",
+            params={"swap_ids": json.dumps(swap_ids)},
+            icon_service=self.icon_service
+        )
+        cancelled = [log for log in result['eventLogs'] if log['indexed'][0] == 'SwapCancelledEvent(int)']
+        self.assertEqual(len(cancelled), 2)
+
+        # Check refund
+        operator_balance = get_icx_balance(super(), address=self._operator.get_address(), icon_service=self.icon_service)
+        self.assertEqual(operator_balance, self._operator_icx_balance)
+
+    def test_cancel_swaps_not_maker(self):
+        swap_id, maker_id, taker_id = self._create_icx_irc2_swap(100, 200)
+
+        # Error: only the maker can cancel its swaps
+        result = transaction_call_error(
+            super(),
+            from_=self._attacker,
+            to_=self._score_address,
+            method="cancel_swaps",
+            params={"swap_ids": json.dumps([swap_id])},
+            icon_service=self.icon_service
+        )
+        self.assertEqual(result['failure']['message'], f"InvalidOrderProvider({self._attacker.get_address()})")
+
+    def test_cancel_account_swaps_ok(self):
+        for _ in range(3):
+            self._create_icx_irc2_swap(100, 200)
+
+        market_info = icx_call(
+            super(),
+            from_=self._operator.get_address(),
+            to_=self._score_address,
+            method="get_market_info",
+            params={"offset": 0},
+            icon_service=self.icon_service
+        )
+
+        # OK
+        transaction_call_success(
+            super(),
+            from_=self._operator,
+            to_=self._score_address,
+            method="cancel_account_swaps",
+            params={"pair": market_info['pairs'][0]['name'], "limit": 2},
+            icon_service=self.icon_service
+        )
+
+        account_pending = icx_call(
+            super(),
+            from_=self._operator.get_address(),
+            to_=self._score_address,
+            method="get_account_pending_swaps",
+            params={"address": self._operator.get_address(), "offset": 0},
+            icon_service=self.icon_service
+        )
+        self.assertEqual(len(account_pending), 1)
+
+        # Check refund
+        operator_balance = get_icx_balance(super(), address=self._operator.get_address(), icon_service=self.icon_service)
+        self.assertEqual(operator_balance, self._operator_icx_balance - 100)
+
     def test_cancel_icx_irc2_swap_already_swapped(self):
         swap_id, maker_id, taker_id = self._create_icx_irc2_swap(100, 200)
         self._fill_irc2_order_success(self._user, self._irc2_address, swap_id, 200)
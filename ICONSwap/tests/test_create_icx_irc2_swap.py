@@ -101,6 +101,52 @@ class TestICONSwap(ICONSwapTests):
         operator_icx_balance = get_icx_balance(super(), address=self._operator.get_address(), icon_service=self.icon_service)
         self.assertEqual(operator_icx_balance, self._operator_icx_balance - 100)
 
+    def test_create_icx_irc2_swaps_ok(self):
+        self._add_whitelist(ICX_CONTRACT)
+        self._add_whitelist(self._irc2_address)
+
+        swaps = [
+            {'maker_amount': hex(100), 'taker_contract': self._irc2_address, 'taker_amount': hex(200)},
+            {'maker_amount': hex(50), 'taker_contract': self._irc2_address, 'taker_amount': hex(120)}
+        ]
+
+        # OK
+        result = transaction_call_success(
+            super(),
+            from_=self._operator,
+            to_=self._score_address,
+            method="create_icx_swaps",
+            params={'swaps': json.dumps(swaps)},
+            value=150,
+            icon_service=self.icon_service
+        )
+        created = [log for log in result['eventLogs'] if log['indexed'][0] == 'SwapCreatedEvent(int,int,int)']
+        self.assertEqual(len(created), 2)
+
+        # OK
+        operator_icx_balance = get_icx_balance(super(), address=self._operator.get_address(), icon_service=self.icon_service)
+        self.assertEqual(operator_icx_balance, self._operator_icx_balance - 150)
+
+    def test_create_icx_irc2_swaps_wrong_amount(self):
+        self._add_whitelist(ICX_CONTRACT)
+        self._add_whitelist(self._irc2_address)
+
+        swaps = [
+            {'maker_amount': hex(100), 'taker_contract': self._irc2_address, 'taker_amount': hex(200)}
+        ]
+
+        # Error
+        result = transaction_call_error(
+            super(),
+            from_=self._operator,
+            to_=self._score_address,
+            method="create_icx_swaps",
+            params={'swaps': json.dumps(swaps)},
+            value=150,
+            icon_service=self.icon_service
+        )
+        self.assertEqual(result['failure']['message'], "InvalidBatchAmount(150, 100)")
+
     def test_create_icx_irc2_swap_not_whitelisted(self):
         self._add_whitelist(self._irc2_address)
         # ICX_CONTRACT is not whitelisted
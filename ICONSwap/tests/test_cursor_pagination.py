@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 ICONation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ICONSwap.tests.iconswap_utils import *
+
+
+class TestICONSwap(ICONSwapDeployedTests):
+
+    def test_cursor_pagination_ok(self):
+        self._create_icx_irc2_swap(200, 300)
+        swap_id_10icx_20irc2 = self._create_icx_irc2_swap(10, 20)[0]
+        self._create_irc2_icx_swap(10, 20)
+        self._create_irc2_icx_swap(20, 30)
+        self._fill_irc2_order_success(self._user, self._irc2_address, swap_id_10icx_20irc2, 20)
+
+        market_info = self._get_market_info(0)
+        pair = market_info['pairs'][0]['name']
+        address = self._operator.get_address()
+
+        for method in ["get_market_buyers_pending_swaps", "get_market_sellers_pending_swaps"]:
+            by_offset = self._call(method, {"pair": pair, "offset": 0})
+            page = self._call(method + "_after", {"pair": pair, "cursor": ""})
+            # Order book cursors are positions, empty for the last page
+            self.assertEqual(page['cursor'], "")
+            self.assertEqual(page['swaps'], by_offset)
+
+        for method, params in [
+            ("get_market_filled_swaps", {"pair": pair}),
+            ("get_account_pending_swaps", {"address": address}),
+            ("get_account_filled_swaps", {"address": address}),
+            ("get_account_pair_pending_swaps", {"address": address, "pair": pair}),
+            ("get_account_pair_filled_swaps", {"address": address, "pair": pair}),
+        ]:
+            by_offset = self._call(method, {**params, "offset": 0})
+            page = self._call(method + "_after", {**params, "cursor": 0})
+            # A partial page is the last page
+            self.assertEqual(page['cursor'], 0)
+            self.assertEqual(page['swaps'], by_offset)
+
+            if len(by_offset) > 1:
+                # Resume after the first swap
+                first_id = by_offset[0]['id']
+                page = self._call(method + "_after", {**params, "cursor": first_id})
+                self.assertEqual(page['swaps'], by_offset[1:])
+
+        account_pending = self._call("get_account_pending_swaps_after", {"address": address, "cursor": 0})
+        self.assertEqual(len(account_pending['swaps']), 3)
+
+    def test_cursor_pagination_removed_cursor(self):
+        # SELL ICX - 1 ICX = 1.5 IRC2, 3/2 IRC2 per ICX in the order book
+        swap_id_200icx_300irc2 = self._create_icx_irc2_swap(200, 300)[0]
+        swap_id_20icx_30irc2 = self._create_icx_irc2_swap(20, 30)[0]
+        # SELL ICX - 1 ICX = 2 IRC2
+        swap_id_10icx_20irc2 = self._create_icx_irc2_swap(10, 20)[0]
+
+        pair = self._get_market_info(0)['pairs'][0]['name']
+        address = self._operator.get_address()
+
+        # The swap of the cursor is cancelled before the next page
+        self._cancel_swap(swap_id_20icx_30irc2)
+
+        page = self._call("get_market_sellers_pending_swaps_after", {"pair": pair, "cursor": f"3/2:{swap_id_20icx_30irc2}"})
+        self.assertEqual([swap['id'] for swap in page['swaps']], [swap_id_10icx_20irc2])
+
+        # Account pending swaps are sorted by descending id
+        page = self._call("get_account_pending_swaps_after", {"address": address, "cursor": swap_id_20icx_30irc2})
+        self.assertEqual([swap['id'] for swap in page['swaps']], [swap_id_200icx_300irc2])
+
+        page = self._call("get_account_pair_pending_swaps_after", {"address": address, "pair": pair, "cursor": swap_id_20icx_30irc2})
+        self.assertEqual([swap['id'] for swap in page['swaps']], [swap_id_200icx_300irc2])
+
+        # The whole price level of the cursor is removed
+        self._cancel_swap(swap_id_200icx_300irc2)
+        page = self._call("get_market_sellers_pending_swaps_after", {"pair": pair, "cursor": f"3/2:{swap_id_200icx_300irc2}"})
+        self.assertEqual([swap['id'] for swap in page['swaps']], [swap_id_10icx_20irc2])
@@ -93,6 +93,71 @@ class TestICONSwap(ICONSwapTests):
         self.assertEqual(user_icx_balance, self._user_icx_balance + maker_ratio)
         self.assertEqual(user_irc2_balance, self._user_irc2_balance - taker_ratio)
 
+    def test_do_icx_irc2_swap_partial_trade_ok(self):
+        maker = 100
+        taker = 200
+        swap_id, maker_id, taker_id = self._create_icx_irc2_swap(maker, taker)
+        self._fill_irc2_order_success(self._user, self._irc2_address, swap_id, 66)
+
+        trades = icx_call(
+            super(),
+            from_=self._operator.get_address(),
+            to_=self._score_address,
+            method="get_swap_trades",
+            params={"swap_id": swap_id, "offset": 0},
+            icon_service=self.icon_service
+        )
+
+        # The partial fill is recorded as a trade of the swap
+        self.assertEqual(len(trades), 1)
+        self.assertEqual(trades[0]['swap_id'], swap_id)
+        self.assertEqual(trades[0]['maker_amount'], 33)
+        self.assertEqual(trades[0]['taker_amount'], 66)
+        self.assertEqual(trades[0]['taker_address'], self._user.get_address())
+
+        trade = icx_call(
+            super(),
+            from_=self._operator.get_address(),
+            to_=self._score_address,
+            method="get_trade",
+            params={"trade_id": trades[0]['id']},
+            icon_service=self.icon_service
+        )
+        self.assertEqual(trade, trades[0])
+
+        market_info = icx_call(
+            super(),
+            from_=self._operator.get_address(),
+            to_=self._score_address,
+            method="get_market_info",
+            params={"offset": 0},
+            icon_service=self.icon_service
+        )
+
+        # The trade is listed for both the maker and the taker
+        for address in (self._operator.get_address(), self._user.get_address()):
+            account_trades = icx_call(
+                super(),
+                from_=self._operator.get_address(),
+                to_=self._score_address,
+                method="get_account_trades",
+                params={"address": address, "offset": 0},
+                icon_service=self.icon_service
+            )
+            self.assertEqual(account_trades, trades)
+
+            account_pair_trades = icx_call(
+                super(),
+                from_=self._operator.get_address(),
+                to_=self._score_address,
+                method="get_account_pair_trades",
+                params={
+                    "address": address,
+                    "pair": market_info['pairs'][0]['name'], "offset": 0},
+                icon_service=self.icon_service
+            )
+            self.assertEqual(account_pair_trades, trades)
+
     def test_do_icx_irc2_swap_partial_and_cancel_ok(self):
         maker = 100
         taker = 200
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 ICONation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from ICONSwap.scorelib.id_factory import *
+from ICONSwap.tests.mock_db import MockIconScoreDatabase
+
+
+class TestIdFactory(unittest.TestCase):
+
+    def setUp(self):
+        self._db = MockIconScoreDatabase()
+
+    def _factory(self) -> IdFactory:
+        return IdFactory('test', self._db)
+
+    def test_id_factory_uids(self):
+        self.assertEqual(self._factory().get_last_uid(), 0)
+        self.assertFalse(self._factory().is_issued(0))
+
+        self.assertEqual(self._factory().get_uid(), 1)
+        # Consecutive UIDs are reserved at once, following the last one
+        self.assertEqual(list(self._factory().get_uids(3)), [2, 3, 4])
+        self.assertEqual(self._factory().get_uid(), 5)
+        self.assertEqual(self._factory().get_last_uid(), 5)
+
+        self.assertTrue(self._factory().is_issued(4))
+        self.assertFalse(self._factory().is_issued(6))
+
+    def test_id_factory_independent_names(self):
+        self._factory().get_uids(2)
+        self.assertEqual(IdFactory('other', self._db).get_uid(), 1)
+        self.assertEqual(self._factory().get_uid(), 3)
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 ICONation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import unittest
+
+from iconservice import *
+from ICONSwap.scorelib.consts import *
+from ICONSwap.scorelib.linked_list import *
+from ICONSwap.scorelib.linked_list import _NodeDB
+from ICONSwap.tests.mock_db import MockIconScoreDatabase
+
+
+class TestLinkedListDB(unittest.TestCase):
+
+    def setUp(self):
+        self._db = MockIconScoreDatabase()
+
+    def _linked_list(self, indexed=False) -> UIDLinkedListDB:
+        # A new instance doesn't share the nodes cache of the previous operations
+        return UIDLinkedListDB('test', self._db, indexed)
+
+    def _legacy_node(self, uid: int, field: str) -> VarDB:
+        """ Returns a field of a node, as stored before v0.5.0 """
+        name = f'{uid}{self._linked_list()._name}{_NodeDB._NAME}'
+        return VarDB(f'{name}_{field}', self._db, int)
+
+    def _write_legacy(self, uids: list) -> None:
+        """ Write a linked list with the storage layout used before v0.5.0 """
+        for index, uid in enumerate(uids):
+            self._legacy_node(uid, 'init').set(1)
+            self._legacy_node(uid, 'value').set(uid)
+            self._legacy_node(uid, 'prev').set(uids[index - 1] if index > 0 else 0)
+            self._legacy_node(uid, 'next').set(uids[index + 1] if index < len(uids) - 1 else 0)
+
+        linked_list = self._linked_list()
+        linked_list._head_id.set(uids[0])
+        linked_list._tail_id.set(uids[-1])
+        linked_list._length.set(len(uids))
+
+    def _random_operation(self, rnd: random.Random, reference: list, uid: int, indexed: bool) -> int:
+        """ Apply a random operation to the linked list and to the reference list.
+            Returns the last uid used """
+        linked_list = self._linked_list(indexed)
+        operation = rnd.random()
+
+        if reference and operation < 0.25:
+            removed = rnd.choice(reference)
+            linked_list.remove(removed)
+            reference.remove(removed)
+        elif operation < 0.45:
+            uid += 1
+            linked_list.prepend(uid)
+            reference.insert(0, uid)
+        elif operation < 0.6:
+            uid += 1
+            linked_list.append(uid)
+            reference.append(uid)
+        elif reference and operation < 0.7:
+            after = rnd.choice(reference)
+            uid += 1
+            linked_list.append_after(uid, after)
+            reference.insert(reference.index(after) + 1, uid)
+        elif reference and operation < 0.8:
+            before = rnd.choice(reference)
+            uid += 1
+            linked_list.prepend_before(uid, before)
+            reference.insert(reference.index(before), uid)
+        elif len(reference) > 3 and operation < 0.9:
+            moved = rnd.choice(reference[1:-1])
+            target = rnd.choice([cur for cur in reference if cur != moved])
+            reference.remove(moved)
+            if rnd.random() < 0.5:
+                linked_list.move_node_after(moved, target)
+                reference.insert(reference.index(target) + 1, moved)
+            else:
+                linked_list.move_node_before(moved, target)
+                reference.insert(reference.index(target), moved)
+        elif len(reference) > 3:
+            moved = rnd.choice(reference[1:-1])
+            reference.remove(moved)
+            if rnd.random() < 0.5:
+                linked_list.move_node_tail(moved)
+                reference.append(moved)
+            else:
+                linked_list.move_node_head(moved)
+                reference.insert(0, moved)
+
+        return uid
+
+    def test_linked_list_random(self):
+        rnd = random.Random(0)
+        reference = []
+        uid = 0
+
+        for _ in range(1000):
+            uid = self._random_operation(rnd, reference, uid, False)
+            self.assertEqual(list(self._linked_list()), reference)
+            self.assertEqual(len(self._linked_list()), len(reference))
+
+        self._linked_list().clear()
+        self.assertEqual(list(self._linked_list()), [])
+
+    def test_linked_list_remove_relink(self):
+        for uid in range(1, 6):
+            self._linked_list().append(uid)
+
+        # Head, tail and middle nodes
+        for uid in (1, 5, 3):
+            self._linked_list().remove(uid)
+
+        self.assertEqual(list(self._linked_list()), [2, 4])
+        self.assertEqual(self._linked_list().next(2), 4)
+        self.assertEqual(self._linked_list().prev(4), 2)
+        self.assertEqual(list(self._linked_list().iterate_after(2)), [4])
+        self.assertRaises(LinkedNodeNotFound, list, self._linked_list().iterate_after(3))
+
+    def test_linked_list_legacy_nodes(self):
+        self._write_legacy([1, 2, 3, 4])
+
+        # The legacy nodes are read as they are
+        self.assertEqual(list(self._linked_list()), [1, 2, 3, 4])
+        self.assertEqual(self._linked_list().select(1), [2, 3, 4])
+
+        # A legacy node is packed when it is modified, its legacy fields are removed
+        self._linked_list().remove(3)
+        for uid in (2, 3, 4):
+            self.assertEqual(self._legacy_node(uid, 'init').get(), 0)
+        # Nodes that haven't been modified keep their legacy fields
+        self.assertEqual(self._legacy_node(1, 'next').get(), 2)
+
+        self._linked_list().append(5)
+        self._linked_list().move_node_head(4)
+        self.assertEqual(list(self._linked_list()), [4, 1, 2, 5])
+
+        rnd = random.Random(1)
+        reference = [4, 1, 2, 5]
+        uid = 5
+        for _ in range(300):
+            uid = self._random_operation(rnd, reference, uid, False)
+        self.assertEqual(list(self._linked_list()), reference)
+
+    def test_linked_list_index_random(self):
+        rnd = random.Random(2)
+        reference = []
+        uid = 0
+
+        # Nodes created before the index was enabled
+        for uid in range(1, 151):
+            self._linked_list().prepend(uid)
+            reference.insert(0, uid)
+
+        for step in range(800):
+            if rnd.random() < 0.1:
+                self._linked_list(True).build_index(rnd.randint(1, 40))
+            else:
+                uid = self._random_operation(rnd, reference, uid, True)
+
+            if step % 20 == 0:
+                for offset in (0, len(reference) // 2, max(0, len(reference) - 3), rnd.randint(0, len(reference))):
+                    self.assertEqual(self._linked_list(True).select(offset),
+                                     reference[offset:offset + MAX_ITERATION_LOOP])
+
+        while self._linked_list(True).build_index(50):
+            pass
+        self.assertEqual(list(self._linked_list(True)), reference)
+        for offset in range(0, len(reference), 7):
+            self.assertEqual(self._linked_list(True).select(offset),
+                             reference[offset:offset + MAX_ITERATION_LOOP])
+
+    def test_linked_list_index_legacy_nodes(self):
+        uids = list(range(1, 121))
+        self._write_legacy(uids)
+
+        # The legacy nodes are reached by iteration until they're indexed
+        self.assertEqual(self._linked_list(True).select(110), uids[110:])
+        self.assertEqual(self._linked_list(True).build_index(100), 20)
+        self.assertEqual(self._linked_list(True).select(105), uids[105:])
+        self.assertEqual(self._linked_list(True).build_index(100), 0)
+        self.assertEqual(self._linked_list(True).select(60), uids[60:60 + MAX_ITERATION_LOOP])
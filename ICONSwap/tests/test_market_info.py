@@ -81,6 +81,27 @@ class TestICONSwap(ICONSwapTests):
         self.assertEqual(market_info['pairs'][0]['swaps_pending_count'], 5)
         self.assertEqual(market_info['pairs'][0]['last_price'], 0)
 
+    def test_market_info_summary_ok(self):
+        (swap_id_200icx_300irc2,
+            swap_id_10icx_20irc2,
+            swap_id_100icx_200irc2,
+            swap_id_10irc2_20icx,
+            swap_id_20irc2_30icx) = self._create_market()
+
+        self._fill_irc2_order_success(self._user, self._irc2_address, swap_id_100icx_200irc2, 200)
+
+        pair = self._get_market_info(0)['pairs'][0]
+        self.assertEqual(pair['swaps_pending_count'], 4)
+        self.assertEqual(pair['trade_count'], 1)
+        self.assertEqual(pair['base_volume'], 100)
+        self.assertEqual(pair['quote_volume'], 200)
+        # The last price is expressed in ICX per IRC2
+        self.assertAlmostEqual(pair['last_price'], 0.5)
+        # The order book prices are expressed in IRC2 per ICX
+        self.assertAlmostEqual(pair['best_bid'], 20 / 30)
+        self.assertAlmostEqual(pair['best_ask'], 300 / 200)
+        self.assertLess(pair['best_bid'], pair['best_ask'])
+
     def test_get_market_sellers_pending_swaps_ok(self):
         self._create_market()
         market_info = self._get_market_info(0)
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 ICONation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ICONSwap.tests.iconswap_utils import *
+
+
+class TestICONSwap(ICONSwapDeployedTests):
+
+    def _market_create_limit_icx_order(self, call, a1, a2, mode):
+        return call(
+            super(),
+            from_=self._operator,
+            to_=self._score_address,
+            method="market_create_limit_icx_order",
+            params={'taker_contract': self._irc2_address, 'taker_amount': a2, 'mode': mode},
+            value=a1,
+            icon_service=self.icon_service
+        )
+
+    def _get_account_pending_swaps(self):
+        return icx_call(
+            super(),
+            from_=self._operator.get_address(),
+            to_=self._score_address,
+            method="get_account_pending_swaps",
+            params={"address": self._operator.get_address(), "offset": 0},
+            icon_service=self.icon_service
+        )
+
+    # ===============================================================
+    def test_market_order_ioc_empty_book(self):
+        self._add_whitelist(ICX_CONTRACT)
+        self._add_whitelist(self._irc2_address)
+
+        # OK
+        self._market_create_limit_icx_order(transaction_call_success, 100, 200, 1)
+
+        # The order is refunded and doesn't rest in the order book
+        self.assertEqual(self._get_account_pending_swaps(), [])
+        operator_balance = get_icx_balance(super(), address=self._operator.get_address(), icon_service=self.icon_service)
+        self.assertEqual(operator_balance, self._operator_icx_balance)
+
+    def test_market_order_ioc_partial(self):
+        self._create_irc2_icx_swap(200, 100)
+
+        # OK
+        result = self._market_create_limit_icx_order(transaction_call_success, 150, 300, 1)
+
+        # The swap is filled and the remainder refunded
+        self.assertEqual(self._get_account_pending_swaps(), [])
+        swept = [log for log in result['eventLogs'] if log['indexed'][0] == 'MarketOrderSweptEvent(Address,int,int,int,bool)']
+        fills, last_swap_id, remainder, capped = map(lambda x: int(x, 16), swept[0]['data'])
+        self.assertEqual(fills, 1)
+        self.assertEqual(remainder, 50)
+        self.assertEqual(capped, 0)
+
+    def test_market_order_fills_capped(self):
+        swap_ids = [self._create_irc2_icx_swap(200, 100)[0] for _ in range(31)]
+
+        # OK
+        result = self._market_create_limit_icx_order(transaction_call_success, 3100, 6200, 0)
+
+        # The sweep stops after 30 fills, and the remainder crossing
+        # the last swap is refunded rather than resting in the order book
+        swept = [log for log in result['eventLogs'] if log['indexed'][0] == 'MarketOrderSweptEvent(Address,int,int,int,bool)']
+        fills, last_swap_id, remainder, capped = map(lambda x: int(x, 16), swept[0]['data'])
+        self.assertEqual(fills, 30)
+        self.assertEqual(last_swap_id, swap_ids[29])
+        self.assertEqual(remainder, 100)
+        self.assertEqual(capped, 1)
+        self.assertEqual([swap['id'] for swap in self._get_account_pending_swaps()], [swap_ids[30]])
+
+    def test_market_order_fok_killed(self):
+        self._create_irc2_icx_swap(200, 100)
+
+        # OK
+        result = self._market_create_limit_icx_order(transaction_call_success, 150, 300, 2)
+
+        # Nothing has been filled
+        filled = [log for log in result['eventLogs'] if log['indexed'][0] == 'SwapSuccessEvent(int)']
+        self.assertEqual(filled, [])
+        self.assertEqual(len(self._get_account_pending_swaps()), 1)
+
+    def test_market_order_fok_filled(self):
+        self._create_irc2_icx_swap(200, 100)
+
+        # OK
+        self._market_create_limit_icx_order(transaction_call_success, 100, 200, 2)
+        self.assertEqual(self._get_account_pending_swaps(), [])
+
+    def test_market_order_self_cross(self):
+        swap_id = self._create_irc2_icx_swap(200, 100)[0]
+
+        # OK: the operator fills its own swap
+        self._market_create_limit_icx_order(transaction_call_success, 100, 200, 0)
+
+        account_filled = icx_call(
+            super(),
+            from_=self._operator.get_address(),
+            to_=self._score_address,
+            method="get_account_filled_swaps",
+            params={"address": self._operator.get_address(), "offset": 0},
+            icon_service=self.icon_service
+        )
+        self.assertEqual([swap['id'] for swap in account_filled], [swap_id])
+
+    def test_market_order_invalid_mode(self):
+        self._add_whitelist(ICX_CONTRACT)
+        self._add_whitelist(self._irc2_address)
+
+        # Error
+        result = self._market_create_limit_icx_order(transaction_call_error, 100, 200, 3)
+        self.assertEqual(result['failure']['message'], "InvalidMarketOrderMode(3)")
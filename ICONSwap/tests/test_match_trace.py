@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 ICONation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ICONSwap.tests.iconswap_utils import *
+
+
+class TestICONSwap(ICONSwapDeployedTests):
+
+    def test_match_trace_disabled(self):
+        self._add_whitelist(ICX_CONTRACT)
+        self._add_whitelist(self._irc2_address)
+        self._market_create_limit_icx_order(10, 20)
+        self.assertEqual(self._call("get_match_traces", {}), [])
+
+    def test_match_trace_stored(self):
+        self._add_whitelist(ICX_CONTRACT)
+        self._add_whitelist(self._irc2_address)
+        self._set_match_trace_level(self._operator, transaction_call_success, 2)
+        self._market_create_limit_icx_order(10, 20)
+
+        traces = self._call("get_match_traces", {})
+        self.assertEqual(len(traces), 1)
+        self.assertEqual([record['phase'] for record in traces[0]], ['order', 'decimals', 'end_of_book'])
+        self.assertEqual(traces[0][0]['maker_amount'], 10)
+
+    def test_match_trace_level_not_owner(self):
+        self._set_match_trace_level(self._attacker, transaction_call_error, 2)
+
+    def test_match_trace_level_invalid(self):
+        result = self._set_match_trace_level(self._operator, transaction_call_error, 3)
+        self.assertEqual(result['failure']['message'], "InvalidMatchTraceLevel(3)")
+
+    # ===============================================================
+    def _set_match_trace_level(self, from_, call, level):
+        return call(
+            super(),
+            from_=from_,
+            to_=self._score_address,
+            method="set_match_trace_level",
+            params={"level": level},
+            icon_service=self.icon_service
+        )
+
+    def _market_create_limit_icx_order(self, a1, a2):
+        return transaction_call_success(
+            super(),
+            from_=self._operator,
+            to_=self._score_address,
+            method="market_create_limit_icx_order",
+            params={'taker_contract': self._irc2_address, 'taker_amount': a2},
+            value=a1,
+            icon_service=self.icon_service
+        )
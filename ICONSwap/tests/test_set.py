@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 ICONation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import unittest
+
+from iconservice import *
+from ICONSwap.scorelib.set import *
+from ICONSwap.tests.mock_db import MockIconScoreDatabase
+
+
+def remove_reference(reference: list, index: int, order: bool) -> None:
+    """ Remove an item from a reference list the way an ordered or unordered bag does """
+    if order:
+        reference.pop(index)
+    else:
+        # The last item is moved to the slot of the removed item
+        last = reference.pop()
+        if index < len(reference):
+            reference[index] = last
+
+
+class TestSetDB(unittest.TestCase):
+
+    def setUp(self):
+        self._db = MockIconScoreDatabase()
+
+    def _set(self, order: bool) -> SetDB:
+        return SetDB('test', self._db, int, order)
+
+    def _write_legacy(self, items: list) -> None:
+        """ Write a set with the storage layout used before v0.5.0 """
+        legacy = ArrayDB(f'test{SetDB._NAME}{BagDB._NAME}_items', self._db, value_type=int)
+        for item in items:
+            legacy.put(item)
+
+    def _check_random(self, order: bool, seed: int) -> None:
+        rnd = random.Random(seed)
+        reference = list(dict.fromkeys(rnd.randint(1, 300) for _ in range(60)))
+        self._write_legacy(reference)
+
+        for _ in range(1000):
+            item = rnd.randint(1, 300)
+            operation = rnd.random()
+
+            if operation < 0.4:
+                self._set(order).add(item)
+                if item not in reference:
+                    reference.append(item)
+            elif operation < 0.7:
+                if item in reference:
+                    self._set(order).remove(item)
+                    remove_reference(reference, reference.index(item), order)
+                else:
+                    self.assertRaises(ItemNotFound, self._set(order).remove, item)
+            elif operation < 0.8:
+                self._set(order).build_index(rnd.randint(1, 10))
+            elif operation < 0.85:
+                self._set(order).compact(rnd.randint(1, 10))
+            elif operation < 0.9 and reference:
+                self.assertEqual(self._set(order).pop(), reference.pop())
+
+            self.assertEqual(item in self._set(order), item in reference)
+            self.assertEqual(list(self._set(order)), reference)
+            self.assertEqual(len(self._set(order)), len(reference))
+
+        while self._set(order).build_index(7):
+            pass
+        for item in range(1, 301):
+            self.assertEqual(item in self._set(order), item in reference)
+
+    def test_set_unordered(self):
+        self._check_random(False, 0)
+
+    def test_set_ordered(self):
+        self._check_random(True, 1)
+
+    def test_set_legacy_items(self):
+        self._write_legacy([5, 3, 8])
+
+        # The items without stored position are found by scanning them
+        self.assertIn(3, self._set(False))
+        self.assertNotIn(4, self._set(False))
+        self._set(False).add(3)
+        self.assertEqual(list(self._set(False)), [5, 3, 8])
+
+        self.assertEqual(self._set(False).build_index(2), 1)
+        self._set(False).remove(5)
+        self.assertEqual(list(self._set(False)), [8, 3])
+        self.assertEqual(self._set(False).build_index(2), 0)
+        self.assertIn(8, self._set(False))
+
+
+class TestBagDB(unittest.TestCase):
+
+    def setUp(self):
+        self._db = MockIconScoreDatabase()
+
+    def _bag(self, order: bool) -> BagDB:
+        return BagDB('test', self._db, int, order)
+
+    def _write_legacy(self, items: list) -> None:
+        """ Write a bag with the storage layout used before v0.5.0 """
+        legacy = ArrayDB(f'test{BagDB._NAME}_items', self._db, value_type=int)
+        for item in items:
+            legacy.put(item)
+
+    def _check_random(self, order: bool, seed: int) -> None:
+        rnd = random.Random(seed)
+        reference = [rnd.randint(1, 20) for _ in range(40)]
+        self._write_legacy(reference)
+
+        for _ in range(1000):
+            item = rnd.randint(1, 20)
+            operation = rnd.random()
+
+            if operation < 0.4:
+                self._bag(order).add(item)
+                reference.append(item)
+            elif operation < 0.6:
+                self._bag(order).remove(item)
+                if item in reference:
+                    remove_reference(reference, reference.index(item), order)
+            elif operation < 0.7 and order and reference:
+                slots = [index for index, cur in self._bag(order)._slots()]
+                position = rnd.randrange(len(slots))
+                self._bag(order).remove_at(slots[position])
+                reference.pop(position)
+            elif operation < 0.8:
+                self._bag(order).compact(rnd.randint(1, 8))
+            elif operation < 0.9:
+                self._bag(order).build_counts(rnd.randint(1, 5))
+
+            self.assertEqual(list(self._bag(order)), reference)
+            self.assertEqual(len(self._bag(order)), len(reference))
+            self.assertEqual(self._bag(order).count(item), reference.count(item))
+            self.assertEqual(item in self._bag(order), item in reference)
+
+        while self._bag(order).build_counts(7):
+            pass
+        for item in range(1, 21):
+            self.assertEqual(self._bag(order).count(item), reference.count(item))
+
+    def test_bag_unordered(self):
+        self._check_random(False, 2)
+
+    def test_bag_ordered(self):
+        self._check_random(True, 3)
+
+    def test_bag_legacy_items(self):
+        self._write_legacy([1, 2, 1])
+
+        # The items that aren't counted yet are counted by scanning them
+        self.assertEqual(self._bag(False).count(1), 2)
+        self.assertIn(2, self._bag(False))
+        self._bag(False).remove(1)
+        self.assertEqual(list(self._bag(False)), [1, 2])
+        self.assertEqual(self._bag(False).count(1), 1)
+
+        self.assertEqual(self._bag(False).build_counts(10), 0)
+        self._bag(False).add(1)
+        self.assertEqual(self._bag(False).count(1), 2)
+        self.assertEqual(self._bag(False).select(0), [1, 2, 1])
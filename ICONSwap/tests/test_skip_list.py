@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 ICONation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import unittest
+
+from ICONSwap.scorelib.skip_list import *
+from ICONSwap.tests.mock_db import MockIconScoreDatabase
+
+
+def ascending(new_key: int, cur_key: int) -> bool:
+    return new_key < cur_key
+
+
+class TestSkipListDB(unittest.TestCase):
+
+    def setUp(self):
+        self._db = MockIconScoreDatabase()
+
+    def _skip_list(self) -> UIDSkipListDB:
+        # A new instance doesn't share the nodes cache of the previous operations
+        return UIDSkipListDB('test', self._db)
+
+    def _items(self) -> list:
+        return [(uid, key) for uid, key in self._skip_list().items()]
+
+    def test_skip_list_order_and_ties(self):
+        keys = {1: 5, 2: 3, 3: 5, 4: 1, 5: 3, 6: 9}
+        for uid, key in keys.items():
+            self._skip_list().add(uid, key, ascending)
+
+        # Sorted by key, the equal keys are kept in their insertion order
+        self.assertEqual(self._items(), [(4, 1), (2, 3), (5, 3), (1, 5), (3, 5), (6, 9)])
+        self.assertEqual(len(self._skip_list()), 6)
+        self.assertEqual(self._skip_list().head_id(), 4)
+        self.assertEqual(self._skip_list().tail_value(), 6)
+
+    def test_skip_list_remove_relink(self):
+        for uid in range(1, 8):
+            self._skip_list().add(uid, uid, ascending)
+
+        # Head, tail and middle nodes
+        for uid in (1, 7, 4):
+            self._skip_list().remove(uid)
+
+        self.assertEqual([uid for uid, key in self._items()], [2, 3, 5, 6])
+        self.assertEqual(self._skip_list().prev(5), 3)
+        self.assertEqual(self._skip_list().next(3), 5)
+        self.assertEqual(self._skip_list().head_id(), 2)
+        self.assertEqual(self._skip_list().tail_value(), 6)
+        self.assertRaises(SkipNodeNotFound, self._skip_list().remove, 4)
+
+    def test_skip_list_items_after_key(self):
+        for uid, key in ((1, 10), (2, 20), (3, 20), (4, 30)):
+            self._skip_list().add(uid, key, ascending)
+
+        def after(key) -> list:
+            return [uid for uid, key in self._skip_list().items_after_key(key, ascending)]
+
+        # Existing keys skip all the nodes with the same key
+        self.assertEqual(after(10), [2, 3, 4])
+        self.assertEqual(after(20), [4])
+        self.assertEqual(after(30), [])
+        # Missing keys resume at the following position
+        self.assertEqual(after(5), [1, 2, 3, 4])
+        self.assertEqual(after(25), [4])
+
+        # A removed key can still be used as a position
+        self._skip_list().remove(4)
+        self.assertEqual(after(25), [])
+
+    def test_skip_list_random(self):
+        rnd = random.Random(0)
+        reference = []
+        uid = 0
+
+        for _ in range(500):
+            if reference and rnd.random() < 0.4:
+                removed = rnd.choice(reference)
+                self._skip_list().remove(removed[1])
+                reference.remove(removed)
+            else:
+                uid += 1
+                key = rnd.randint(1, 20)
+                self._skip_list().add(uid, key, ascending)
+                # Equal keys are kept in their insertion order
+                reference.append((key, uid))
+                reference.sort(key=lambda item: item[0])
+
+            self.assertEqual(self._items(), [(uid, key) for key, uid in reference])
+
+        key = rnd.randint(1, 20)
+        self.assertEqual([uid for uid, key in self._skip_list().items_after_key(key, ascending)],
+                         [uid for cur_key, uid in reference if cur_key > key])
+
+        self._skip_list().clear()
+        self.assertEqual(self._items(), [])
+        self.assertEqual(len(self._skip_list()), 0)
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2020 ICONation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from iconservice import *
+from .consts import *
+
+
+class InvalidMatchTraceLevel(Exception):
+    pass
+
+
+class MatchTraceLevel:
+    DISABLED = 0
+    # Records are written to the SCORE logs
+    LOG = 1
+    # Records are also kept on-chain, see MatchTrace.select
+    STORE = 2
+
+
+class MatchTrace:
+    """ MatchTrace collects structured records of the phases of a market order.
+        Callers check is_enabled() before building a record, so a disabled trace
+        only costs the read of its level.
+        When stored, the records of the last _CAPACITY market orders are kept
+        in a ring buffer.
+    """
+    _NAME = 'MATCH_TRACE'
+    _CAPACITY = 20
+
+    def __init__(self, db: IconScoreDatabase):
+        self._name = MatchTrace._NAME
+        self._level = VarDB(f'{self._name}_LEVEL', db, value_type=int)
+        # Ring buffer slot => JSON list of the records of a market order
+        self._traces = DictDB(f'{self._name}_TRACES', db, value_type=str)
+        self._count = VarDB(f'{self._name}_COUNT', db, value_type=int)
+        self._current_level = None
+        self._records = []
+        self._db = db
+
+    def level(self) -> int:
+        if self._current_level is None:
+            self._current_level = self._level.get()
+        return self._current_level
+
+    def set_level(self, level: int) -> None:
+        if level not in (MatchTraceLevel.DISABLED, MatchTraceLevel.LOG, MatchTraceLevel.STORE):
+            raise InvalidMatchTraceLevel(level)
+        self._level.set(level)
+        self._current_level = level
+
+    def is_enabled(self) -> bool:
+        return self.level() != MatchTraceLevel.DISABLED
+
+    def record(self, phase: str, **fields) -> None:
+        record = {'phase': phase}
+        for field, value in fields.items():
+            record[field] = value if isinstance(value, int) else str(value)
+
+        Logger.info(json_dumps(record), TAG)
+        self._records.append(record)
+
+    def flush(self) -> None:
+        """ Store the records of the current market order in the ring buffer """
+        if self.level() != MatchTraceLevel.STORE or not self._records:
+            return
+
+        count = self._count.get()
+        self._traces[count % MatchTrace._CAPACITY] = json_dumps(self._records)
+        self._count.set(count + 1)
+        self._records = []
+
+    def select(self) -> list:
+        """ Returns the stored traces, the most recent first """
+        count = self._count.get()
+        oldest = max(count - MatchTrace._CAPACITY, 0)
+        return [json_loads(self._traces[index % MatchTrace._CAPACITY]) for index in range(count - 1, oldest - 1, -1)]